@@ -1,23 +1,180 @@
-import os
-import urllib.request
 import random
-import pydub
+import re
+import av
+import numpy as np
+import requests
 import speech_recognition as sr
+import threading
 import time
 import math
-from typing import Optional
+import weakref
+from collections import OrderedDict
+from typing import Optional, Tuple, Union
 from DrissionPage import ChromiumPage
+from DrissionPage.errors import JavaScriptError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from proxy_manager import get_proxy, get_proxy_dict, mark_proxy_success, mark_proxy_failure
 
 
+# Shared session for audio downloads so keep-alive connections survive between solves
+_audio_session = requests.Session()
+_audio_adapter = HTTPAdapter(
+    pool_connections=4, pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.2))
+_audio_session.mount("http://", _audio_adapter)
+_audio_session.mount("https://", _audio_adapter)
+
+# Browser property overrides evaluated ahead of page scripts on every navigation
+_ANTI_DETECT_JS = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined,
+    });
+
+    Object.defineProperty(navigator, 'plugins', {
+        get: () => [1, 2, 3, 4, 5],
+    });
+
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['en-US', 'en'],
+    });
+
+    Object.defineProperty(navigator, 'platform', {
+        get: () => 'MacIntel',
+    });
+
+    // Add realistic canvas fingerprint
+    const originalGetContext = HTMLCanvasElement.prototype.getContext;
+    HTMLCanvasElement.prototype.getContext = function(type, ...args) {
+        const context = originalGetContext.call(this, type, ...args);
+        if (type === '2d') {
+            const originalFillText = context.fillText;
+            context.fillText = function(...args) {
+                return originalFillText.apply(this, args);
+            };
+        }
+        return context;
+    };
+"""
+
+# Drivers that already have _ANTI_DETECT_JS registered
+_anti_detect_drivers = weakref.WeakSet()
+
+# Shared recognizer; recognize_google only reads its settings so threads can share it
+_RECOGNIZER = sr.Recognizer()
+# Once-guard: the first solver to acquire it starts the warm-up; never released
+_recognizer_warm_once = threading.Lock()
+
+
+def _warm_recognizer() -> None:
+    """Run one throwaway recognition to load the request chain and resolve Google's DNS."""
+    try:
+        _RECOGNIZER.recognize_google(sr.AudioData(b"\x00" * 3200, 16000, 2))
+    except Exception:
+        # Silence is expected to be rejected; only the warm-up matters
+        pass
+
+
 class RecaptchaSolver:
     """A class to solve reCAPTCHA challenges using audio recognition with anti-detection measures."""
 
     # Constants
-    TEMP_DIR = os.getenv("TEMP") if os.name == "nt" else "/tmp"
     TIMEOUT_STANDARD = 10
     TIMEOUT_SHORT = 2
-    TIMEOUT_DETECTION = 0.05
+    # Google speech recognition's native format: 16 kHz mono 16-bit PCM
+    AUDIO_SAMPLE_RATE = 16000
+    AUDIO_SAMPLE_WIDTH = 2
+    ELEMENT_CACHE_SIZE = 64
+    # Backoff between challenge/solved polls after the checkbox click
+    CHALLENGE_POLL_DELAYS = (0.1, 0.25, 0.6, 1.4, 3.0)
+
+    # The challenge popup's iframe; present but hidden until a challenge shows
+    _BFRAME_SEL = "iframe[src*='api2/bframe']"
+
+    # Filled with the token once the captcha is accepted (top document)
+    _RESPONSE_SEL = "textarea[name='g-recaptcha-response'],#g-recaptcha-response"
+
+    # Any of these means the checkbox has been accepted
+    _SOLVED_SEL = ".recaptcha-checkbox-checked,[aria-checked='true'],.rc-anchor-checked"
+
+    # Phrases reCAPTCHA shows when it has flagged the session
+    _DETECT_RE = re.compile(
+        r"try again later|unusual traffic|automated|robot|blocked|suspicious", re.I)
+
+    # Challenge iframe candidates; the one hosting the audio button wins
+    _CHALLENGE_IFRAME_SEL = (
+        "iframe[title*='recaptcha challenge'],iframe[title*='challenge'],"
+        "iframe[src*='recaptcha/api2/bframe'],iframe[src*='recaptcha'][src*='bframe'],"
+        "iframe[name*='c-'],iframe[src*='anchor']"
+    )
+
+    # Elements inside the audio challenge, as tiers of union selectors tried
+    # in order (a union matches in document order, so exact IDs get their
+    # own tier ahead of the generic fallbacks)
+    _AUDIO_BTN_SEL = (
+        "#recaptcha-audio-button",
+        "button[title*='audio challenge'],button[id*='audio'],"
+        "button[class*='rc-button-audio'],.rc-button-audio,"
+        "button[aria-label*='audio' i],.rc-audiochallenge-control button",
+    )
+    _AUDIO_SRC_SEL = (
+        "#audio-source[src]",
+        "audio source[src],source[type*='audio'][src],"
+        "source[src*='recaptcha'],audio[src]",
+    )
+    _RESP_FIELD_SEL = (
+        "#audio-response",
+        "input[id*='audio-response'],input[name*='audio'],"
+        ".rc-audiochallenge-response-field,input[placeholder*='audio'],"
+        "input[aria-label*='audio']",
+        "input[type='text']",
+    )
+    _VERIFY_BTN_SEL = (
+        "#recaptcha-verify-button",
+        "button[id*='verify'],button[class*='verify'],button[value*='verify']",
+        ".rc-button-default,button[type='submit'],input[type='submit']",
+    )
+
+    # Token locations in priority order, read in a single evaluation
+    # (an empty location falls through to the next one)
+    _TOKEN_JS = """
+        for (const sel of ['#recaptcha-token',
+                           "input[name='g-recaptcha-response']",
+                           '[data-sitekey]']) {
+            const e = document.querySelector(sel);
+            const token = e && (e.value || e.getAttribute('data-token'));
+            if (token) return token;
+        }
+        return null;
+    """
+
+    # Resolves true once arguments[0] is displayed, false after arguments[1] ms
+    _WAIT_FOR_JS = """
+        return new Promise(resolve => {
+            const visible = () => Array.from(document.querySelectorAll(arguments[0]))
+                .some(e => e.getClientRects().length > 0);
+            if (visible()) return resolve(true);
+            const observer = new MutationObserver(() => {
+                if (visible()) {
+                    observer.disconnect();
+                    clearTimeout(timer);
+                    resolve(true);
+                }
+            });
+            const timer = setTimeout(() => {
+                observer.disconnect();
+                resolve(false);
+            }, arguments[1]);
+            observer.observe(document, {subtree: true, childList: true, attributes: true});
+        });
+    """
+
+    # Replays [x, y, offset_ms] points as mousemove events inside the browser
+    _MOUSE_TRAJECTORY_JS = """
+        arguments[0].forEach(p => setTimeout(() => window.dispatchEvent(
+            new MouseEvent('mousemove', {clientX: p[0], clientY: p[1], bubbles: true})
+        ), p[2]));
+    """
 
     def __init__(self, driver: ChromiumPage) -> None:
         """Initialize the solver with a ChromiumPage driver.
@@ -27,6 +184,15 @@ class RecaptchaSolver:
         """
         self.driver = driver
         self.current_proxy = None
+        # Per-solver generators keep delay sampling off the shared global RNGs
+        self._rng = random.Random()
+        self._np_rng = np.random.default_rng()
+        # (id(context), selector) -> element, cleared whenever a new solve starts
+        self._element_cache = OrderedDict()
+
+        # Warm the speech recognizer in the background for the first solver only
+        if _recognizer_warm_once.acquire(blocking=False):
+            threading.Thread(target=_warm_recognizer, daemon=True).start()
         self._setup_anti_detection()
 
     def _setup_anti_detection(self) -> None:
@@ -47,48 +213,32 @@ class RecaptchaSolver:
             # Set realistic viewport
             self.driver.set.window.size(1920, 1080)
 
-            # Add realistic browser properties
-            self.driver.run_js("""
-                Object.defineProperty(navigator, 'webdriver', {
-                    get: () => undefined,
-                });
-                
-                Object.defineProperty(navigator, 'plugins', {
-                    get: () => [1, 2, 3, 4, 5],
-                });
-                
-                Object.defineProperty(navigator, 'languages', {
-                    get: () => ['en-US', 'en'],
-                });
-                
-                Object.defineProperty(navigator, 'platform', {
-                    get: () => 'MacIntel',
-                });
-                
-                // Add realistic canvas fingerprint
-                const originalGetContext = HTMLCanvasElement.prototype.getContext;
-                HTMLCanvasElement.prototype.getContext = function(type, ...args) {
-                    const context = originalGetContext.call(this, type, ...args);
-                    if (type === '2d') {
-                        const originalFillText = context.fillText;
-                        context.fillText = function(...args) {
-                            return originalFillText.apply(this, args);
-                        };
-                    }
-                    return context;
-                };
-            """)
+            # Add realistic browser properties before any page script runs,
+            # installed once per browser instead of on every solver
+            if self.driver not in _anti_detect_drivers:
+                self.driver.run_cdp(
+                    "Page.addScriptToEvaluateOnNewDocument", source=_ANTI_DETECT_JS)
+                # The current document was loaded before the script was registered
+                self.driver.run_js(_ANTI_DETECT_JS)
+                _anti_detect_drivers.add(self.driver)
 
         except Exception as e:
             print(f"Warning: Could not setup all anti-detection measures: {e}")
 
     def _human_like_delay(self, min_seconds: float = 0.5, max_seconds: float = 2.0) -> None:
         """Add human-like random delay."""
-        delay = random.uniform(min_seconds, max_seconds)
+        delay = self._rng.uniform(min_seconds, max_seconds)
         time.sleep(delay)
 
-    def _human_like_mouse_movement(self, element) -> None:
-        """Simulate human-like mouse movement to element."""
+    def _human_like_mouse_movement(self, element) -> float:
+        """Simulate human-like mouse movement to element.
+
+        The whole trajectory is handed to the browser in one call and replayed
+        there with setTimeout, so no CDP round-trip is spent per step.
+
+        Returns:
+            float: Seconds until the browser finishes replaying the movement
+        """
         try:
             # Get element position - handle ElementRect object properly
             rect = element.rect
@@ -117,47 +267,46 @@ class RecaptchaSolver:
             center_y = y + height / 2
 
             # Add some randomness to the target position
-            target_x = center_x + random.uniform(-5, 5)
-            target_y = center_y + random.uniform(-5, 5)
+            target_x = center_x + self._rng.uniform(-5, 5)
+            target_y = center_y + self._rng.uniform(-5, 5)
 
             # Simulate mouse movement with acceleration/deceleration
             current_x, current_y = 0, 0  # Assume starting from top-left
 
             # Calculate distance
-            distance = math.sqrt((target_x - current_x) **
-                                 2 + (target_y - current_y) ** 2)
+            distance = math.hypot(target_x - current_x, target_y - current_y)
 
             # Number of steps for smooth movement
             steps = max(10, int(distance / 10))
 
-            for i in range(steps + 1):
-                # Ease-in-out curve for natural movement
-                t = i / steps
-                ease_t = t * t * (3 - 2 * t)  # Smoothstep function
+            # Ease-in-out curve for natural movement (smoothstep), vectorized
+            t = np.linspace(0.0, 1.0, steps + 1, dtype=np.float32)
+            ease_t = t * t * (3.0 - 2.0 * t)
+            xs = current_x + (target_x - current_x) * ease_t
+            ys = current_y + (target_y - current_y) * ease_t
 
-                x_pos = current_x + (target_x - current_x) * ease_t
-                y_pos = current_y + (target_y - current_y) * ease_t
+            # Small delay between movements, accumulated into per-step offsets
+            offsets = np.zeros(steps + 1, dtype=np.float32)
+            np.cumsum(self._np_rng.uniform(10, 30, steps), out=offsets[1:])
 
-                # Move mouse (if supported by driver) - fix the coordinate handling
-                try:
-                    self.driver.actions.move_to((x_pos, y_pos))
-                except:
-                    pass  # Some drivers don't support this
+            # Precompute [x, y, offset_ms] for every step of the trajectory
+            points = np.column_stack((xs, ys, offsets)).tolist()
 
-                # Small delay between movements
-                time.sleep(random.uniform(0.01, 0.03))
+            self.driver.run_js(self._MOUSE_TRAJECTORY_JS, points)
+            return points[-1][2] / 1000
 
         except Exception as e:
             print(f"Warning: Could not simulate mouse movement: {e}")
+            return 0.0
 
     def _human_like_click(self, element) -> None:
         """Simulate human-like clicking behavior."""
         try:
             # Move mouse to element first
-            self._human_like_mouse_movement(element)
+            movement_time = self._human_like_mouse_movement(element)
 
-            # Pre-click delay
-            self._human_like_delay(0.1, 0.3)
+            # Pre-click delay, long enough for the movement to finish replaying
+            self._human_like_delay(0.1 + movement_time, 0.3 + movement_time)
 
             # Click with slight randomness
             element.click()
@@ -177,14 +326,16 @@ class RecaptchaSolver:
             Exception: If captcha solving fails or bot is detected
         """
 
+        # Elements resolved during a previous solve belong to a stale DOM
+        self._element_cache.clear()
+
         # Initial page load delay
         self._human_like_delay(1.0, 3.0)
 
         # Handle main reCAPTCHA iframe
         print("Looking for reCAPTCHA iframe...")
-        self.driver.wait.ele_displayed(
-            "@title=reCAPTCHA", timeout=self.TIMEOUT_STANDARD
-        )
+        self._wait_for(self.driver, "iframe[title='reCAPTCHA']",
+                       timeout=self.TIMEOUT_STANDARD)
         self._human_like_delay(0.5, 1.5)
 
         iframe_inner = self.driver("@title=reCAPTCHA")
@@ -192,9 +343,8 @@ class RecaptchaSolver:
 
         # Find and click the checkbox with human-like behavior
         print("Looking for checkbox...")
-        iframe_inner.wait.ele_displayed(
-            ".rc-anchor-content", timeout=self.TIMEOUT_STANDARD
-        )
+        self._wait_for(iframe_inner, ".rc-anchor-content",
+                       timeout=self.TIMEOUT_STANDARD)
 
         checkbox = iframe_inner(".rc-anchor-content",
                                 timeout=self.TIMEOUT_SHORT)
@@ -210,22 +360,22 @@ class RecaptchaSolver:
         # Wait longer for challenge to appear and check multiple times
         print("Checkbox click didn't solve, waiting for challenge...")
 
-        # Check for challenge multiple times with increasing delays
-        for attempt in range(5):
-            print(f"Challenge check attempt {attempt + 1}/5...")
-            self._human_like_delay(2.0, 3.0)
+        # Poll on a backoff schedule so a late acceptance is seen within ~100 ms
+        for attempt, delay in enumerate(self.CHALLENGE_POLL_DELAYS, 1):
+            print(f"Challenge check attempt {attempt}/{len(self.CHALLENGE_POLL_DELAYS)}...")
+            time.sleep(delay)
+
+            has_challenge, solved = self._poll_state()
+            if solved:
+                print("Captcha solved during challenge wait!")
+                return
 
-            if self._check_for_challenge():
+            if has_challenge:
                 print("Challenge detected, trying audio challenge...")
                 self._handle_audio_challenge(iframe_inner)
                 return
-            else:
-                print(f"No challenge detected on attempt {attempt + 1}")
 
-                # Also check if solved
-                if self.is_solved():
-                    print("Captcha solved during challenge wait!")
-                    return
+            print(f"No challenge detected on attempt {attempt}")
 
         print("No challenge detected after multiple attempts")
         if not self.is_solved():
@@ -233,63 +383,50 @@ class RecaptchaSolver:
         else:
             print("Captcha appears to be solved!")
 
-    def _check_for_challenge(self) -> bool:
-        """Check if a challenge interface has appeared."""
-        try:
-            # Look for challenge indicators
-            challenge_indicators = [
-                "iframe[title*='challenge']",
-                "iframe[title*='recaptcha']",
-                ".rc-challenge",
-                ".rc-imageselect",
-                ".rc-audiochallenge",
-                "iframe[src*='recaptcha']",
-                "iframe[src*='challenge']",
-                "iframe[src*='api2/anchor']",
-                "iframe[src*='api2/bframe']"
-            ]
-
-            for indicator in challenge_indicators:
-                try:
-                    element = self.driver.ele(indicator, timeout=1)
-                    if element:
-                        print(
-                            f"Challenge detected with indicator: {indicator}")
-                        return True
-                except:
-                    continue
+    def _wait_for(self, context, selector: str, timeout: float) -> bool:
+        """Wait until an element matching selector is displayed.
 
-            # Also check for any iframe that might be a challenge - simplified approach
-            try:
-                # Just check for the first few common iframe patterns
-                iframe_patterns = [
-                    "iframe[title*='recaptcha']",
-                    "iframe[src*='recaptcha']",
-                    "iframe[src*='challenge']"
-                ]
-
-                for pattern in iframe_patterns:
-                    try:
-                        frame = self.driver.ele(pattern, timeout=1)
-                        if frame:
-                            title = frame.attrs.get("title", "")
-                            src = frame.attrs.get("src", "")
-                            print(
-                                f"Found iframe: title='{title}', src='{src}'")
-                            if "challenge" in title.lower() or "recaptcha" in title.lower():
-                                print(f"Challenge iframe found: {title}")
-                                return True
-                    except:
-                        continue
+        A MutationObserver inside the page resolves as soon as the element
+        shows up, instead of polling over CDP.
 
-            except Exception as e:
-                print(f"Error checking iframes: {e}")
+        Args:
+            context: Page or frame to wait in
+            selector: CSS selector to wait for
+            timeout: Seconds to wait before giving up
 
-            return False
+        Returns:
+            bool: True if the element was displayed before the timeout
+        """
+        try:
+            return bool(context.run_js(
+                self._WAIT_FOR_JS, selector, int(timeout * 1000)))
         except Exception as e:
-            print(f"Error checking for challenge: {e}")
+            print(f"Error waiting for {selector}: {e}")
             return False
 
+    def _poll_state(self) -> Tuple[bool, bool]:
+        """Check for a challenge and for a solved captcha in one round-trip.
+
+        The checkbox lives in a cross-origin frame, so from the top
+        document a challenge means a visible bframe iframe and a solve
+        means a filled g-recaptcha-response field.
+
+        Returns:
+            Tuple[bool, bool]: (challenge present, captcha solved)
+        """
+        try:
+            has_challenge, solved = self.driver.run_js(
+                "return [Array.from(document.querySelectorAll(arguments[0]))"
+                ".some(e => e.getClientRects().length > 0"
+                " && getComputedStyle(e).visibility !== 'hidden'),"
+                " Array.from(document.querySelectorAll(arguments[1]))"
+                ".some(e => !!e.value)];",
+                self._BFRAME_SEL, self._RESPONSE_SEL)
+            return bool(has_challenge), bool(solved)
+        except Exception as e:
+            print(f"Error polling captcha state: {e}")
+            return False, False
+
     def _handle_audio_challenge(self, iframe) -> None:
         """Handle audio challenge with improved element detection based on original repository approach."""
         try:
@@ -304,40 +441,15 @@ class RecaptchaSolver:
             challenge_iframe = None
 
             # Strategy 1: Look for iframe with challenge-related titles (most reliable)
-            challenge_iframe_selectors = [
-                "iframe[title*='recaptcha challenge']",
-                "iframe[title*='challenge']",
-                "iframe[src*='recaptcha/api2/bframe']",
-                "iframe[src*='recaptcha'][src*='bframe']",
-                "iframe[name*='c-']",  # Common pattern for challenge iframes
-                "iframe[src*='anchor']"
-            ]
-
-            for selector in challenge_iframe_selectors:
-                try:
-                    print(f"Trying challenge iframe selector: {selector}")
-                    challenge_iframe = self.driver(selector, timeout=2)
-
-                    if challenge_iframe:
-                        print(
-                            f"Found challenge iframe with selector: {selector}")
-                        # Verify it's actually a challenge iframe by checking for audio elements
-                        try:
-                            # Try to find audio button inside this iframe
-                            test_audio = challenge_iframe(
-                                "#recaptcha-audio-button", timeout=1)
-                            if test_audio:
-                                print(
-                                    "Confirmed challenge iframe contains audio button")
-                                break
-                        except:
-                            print(
-                                "Iframe found but no audio button, continuing search...")
-                            challenge_iframe = None
-
-                except Exception as e:
-                    print(f"Challenge iframe selector {selector} failed: {e}")
-                    continue
+            try:
+                # One query for every candidate, then keep the one hosting the audio button
+                for frame in self.driver.eles(f"css:{self._CHALLENGE_IFRAME_SEL}", timeout=2):
+                    if self._find_first(frame, self._AUDIO_BTN_SEL, timeout=1):
+                        print("Confirmed challenge iframe contains audio button")
+                        challenge_iframe = frame
+                        break
+            except Exception as e:
+                print(f"Challenge iframe lookup failed: {e}")
 
             # Strategy 2: If no specific challenge iframe found, use the provided iframe
             if not challenge_iframe:
@@ -348,85 +460,38 @@ class RecaptchaSolver:
                 print("WARNING: No challenge iframe found, using main page context")
                 challenge_iframe = self.driver
 
-            # Now look for the audio button with improved selectors
+            # Now look for the audio button with a single union selector
+            # (resolved from cache when it already confirmed the iframe above)
             print("Looking for audio button...")
-            audio_button = None
-
-            # Original repository's primary selector pattern
-            audio_button_selectors = [
-                "#recaptcha-audio-button",  # Primary selector from original repo
-                "button[title*='Get an audio challenge']",
-                "button[title*='audio challenge']",
-                "button[id*='audio']",
-                "button[class*='rc-button-audio']",
-                ".rc-button-audio",
-                "button[aria-label*='audio']",
-                "button[aria-label*='Audio']",
-                # XPath based selectors (more reliable for dynamic content)
-                "xpath://button[contains(@id, 'audio')]",
-                "xpath://button[contains(@title, 'audio')]",
-                "xpath://button[contains(@aria-label, 'audio')]",
-                "xpath://button[contains(@class, 'audio')]",
-                # Generic button selectors as last resort
-                "xpath://div[@class='rc-audiochallenge-control']//button[1]",
-                "xpath://div[contains(@class, 'challenge')]//button[contains(@title, 'audio') or contains(@aria-label, 'audio')]"
-            ]
-
-            for selector in audio_button_selectors:
-                try:
-                    print(f"Trying audio button selector: {selector}")
-                    audio_button = challenge_iframe(selector, timeout=2)
+            audio_button = self._find_first(
+                challenge_iframe, self._AUDIO_BTN_SEL, timeout=2)
 
-                    if audio_button:
-                        print(f"Found audio button with selector: {selector}")
-                        # Verify the button is visible and clickable
-                        try:
-                            if audio_button.states().is_displayed and audio_button.states().is_enabled:
-                                print("Audio button is visible and enabled")
-                                break
-                            else:
-                                print(
-                                    "Audio button found but not clickable, continuing search...")
-                                audio_button = None
-                        except:
-                            print("Could not verify button state, but proceeding...")
-                            break
-
-                except Exception as e:
-                    print(f"Audio button selector {selector} failed: {e}")
-                    continue
+            if audio_button:
+                print("Found audio button")
+                # Verify the button is visible and clickable
+                try:
+                    if self._is_clickable(audio_button):
+                        print("Audio button is visible and enabled")
+                    else:
+                        print(
+                            "Audio button found but not clickable, continuing search...")
+                        audio_button = None
+                except Exception:
+                    print("Could not verify button state, but proceeding...")
 
             # If still no audio button found, try a more aggressive search
             if not audio_button:
                 print("Attempting aggressive audio button search...")
                 try:
-                    # Look for buttons one by one to avoid collection issues
-                    button_selectors = [
-                        "button:nth-child(1)",
-                        "button:nth-child(2)",
-                        "button:nth-child(3)",
-                        "button",  # Any button as last resort
-                    ]
-
-                    for btn_sel in button_selectors:
-                        try:
-                            btn = challenge_iframe(btn_sel, timeout=1)
-                            if btn:
-                                btn_text = btn.text.lower() if btn.text else ""
-                                btn_title = btn.attrs.get('title', '').lower()
-                                btn_aria = btn.attrs.get(
-                                    'aria-label', '').lower()
-
-                                print(
-                                    f"Button found: text='{btn_text}', title='{btn_title}', aria='{btn_aria}'")
-
-                                if 'audio' in btn_text or 'audio' in btn_title or 'audio' in btn_aria:
-                                    print(
-                                        f"Found audio button by content analysis")
-                                    audio_button = btn
-                                    break
-                        except:
-                            continue
+                    # Inspect every button's text/title/aria-label in one evaluation
+                    index = challenge_iframe.run_js(
+                        "return Array.from(document.querySelectorAll('button')).findIndex(b =>"
+                        " ((b.textContent || '') + (b.title || '') + (b.getAttribute('aria-label') || ''))"
+                        ".toLowerCase().includes('audio'));")
+
+                    if index is not None and index >= 0:
+                        audio_button = challenge_iframe(
+                            f"xpath:(//button)[{index + 1}]", timeout=1) or None
 
                     if audio_button:
                         print("Audio button found through aggressive search")
@@ -452,49 +517,17 @@ class RecaptchaSolver:
             print("Waiting for audio to load...")
             self._human_like_delay(3.0, 5.0)
 
-            # Find audio source with improved selectors
+            # Find audio source with a single union selector
             print("Looking for audio source...")
-            audio_source = None
-
-            audio_source_selectors = [
-                "#audio-source",  # Original repository selector
-                "audio source",
-                "source[type*='audio']",
-                "audio[src]",
-                "source[src*='recaptcha']",
-                ".rc-audiochallenge-audio source",
-                ".rc-audiochallenge-audio",
-                "xpath://audio//source[@src]",
-                "xpath://source[contains(@src, 'recaptcha')]",
-                "xpath://audio[@src]"
-            ]
-
-            for selector in audio_source_selectors:
-                try:
-                    print(f"Trying audio source selector: {selector}")
-                    audio_source = challenge_iframe(selector, timeout=3)
-
-                    if audio_source:
-                        print(f"Found audio source with selector: {selector}")
-                        # Verify it has a src attribute
-                        src = audio_source.attrs.get("src")
-                        if src:
-                            print(f"Audio source has valid src: {src[:50]}...")
-                            break
-                        else:
-                            print("Audio source found but no src attribute")
-                            audio_source = None
-
-                except Exception as e:
-                    print(f"Audio source selector {selector} failed: {e}")
-                    continue
+            audio_source = self._find_first(
+                challenge_iframe, self._AUDIO_SRC_SEL, timeout=3)
 
             if not audio_source:
                 raise Exception(
                     "Audio source not found after exhaustive search")
 
             # Get the audio URL
-            src = audio_source.attrs.get("src")
+            src = self._attr(audio_source, "src")
             if not src:
                 raise Exception("Audio source found but no src URL available")
 
@@ -506,34 +539,8 @@ class RecaptchaSolver:
 
             # Find and fill the response field
             print("Looking for response input field...")
-            response_field = None
-
-            response_field_selectors = [
-                "#audio-response",  # Original repository selector
-                "input[id*='audio-response']",
-                "input[name*='audio']",
-                "input[type='text']",
-                ".rc-audiochallenge-response-field",
-                "input[placeholder*='audio']",
-                "input[aria-label*='audio']",
-                "xpath://input[@id='audio-response']",
-                "xpath://input[contains(@class, 'response')]",
-                "xpath://div[contains(@class, 'audiochallenge')]//input[@type='text']"
-            ]
-
-            for selector in response_field_selectors:
-                try:
-                    print(f"Trying response field selector: {selector}")
-                    response_field = challenge_iframe(selector, timeout=2)
-
-                    if response_field:
-                        print(
-                            f"Found response field with selector: {selector}")
-                        break
-
-                except Exception as e:
-                    print(f"Response field selector {selector} failed: {e}")
-                    continue
+            response_field = self._find_first(
+                challenge_iframe, self._RESP_FIELD_SEL, timeout=2)
 
             if not response_field:
                 raise Exception("Response field not found")
@@ -545,54 +552,14 @@ class RecaptchaSolver:
 
             # Find and click the verify button
             print("Looking for verify button...")
-            verify_button = None
-
-            verify_button_selectors = [
-                "#recaptcha-verify-button",  # Original repository selector
-                "button[id*='verify']",
-                "button[type='submit']",
-                ".rc-button-default",
-                "button[value*='verify']",
-                "input[type='submit']",
-                "button:contains('Verify')",
-                "button:contains('Submit')",
-                "xpath://button[@id='recaptcha-verify-button']",
-                "xpath://button[contains(@class, 'verify')]",
-                "xpath://button[@type='submit']",
-                # Often the last button
-                "xpath://div[contains(@class, 'audiochallenge')]//button[last()]"
-            ]
-
-            for selector in verify_button_selectors:
-                try:
-                    print(f"Trying verify button selector: {selector}")
-                    verify_button = challenge_iframe(selector, timeout=2)
-
-                    if verify_button:
-                        print(f"Found verify button with selector: {selector}")
-                        break
-
-                except Exception as e:
-                    print(f"Verify button selector {selector} failed: {e}")
-                    continue
+            verify_button = self._find_first(
+                challenge_iframe, self._VERIFY_BTN_SEL, timeout=2)
 
             if not verify_button:
-                # As a last resort, look for submit-type buttons
-                print("Looking for any submit button as last resort...")
-                try:
-                    submit_selectors = [
-                        "button[type='submit']", "input[type='submit']", "button"]
-                    for sel in submit_selectors:
-                        try:
-                            verify_button = challenge_iframe(sel, timeout=1)
-                            if verify_button:
-                                print(
-                                    f"Found fallback button with selector: {sel}")
-                                break
-                        except:
-                            continue
-                except:
-                    pass
+                # As a last resort, take any button in the challenge
+                print("Looking for any button as last resort...")
+                verify_button = self._find_first(
+                    challenge_iframe, "button", timeout=1)
 
             if not verify_button:
                 raise Exception("Verify button not found")
@@ -618,6 +585,57 @@ class RecaptchaSolver:
             print(f"❌ Audio challenge failed: {str(e)}")
             raise Exception(f"Audio challenge failed: {str(e)}")
 
+    def _find_first(self, context, selector: Union[str, Tuple[str, ...]], timeout: float):
+        """Find the first element matching a (union) CSS selector.
+
+        A tuple of selectors is tried tier by tier: the first tier waits up
+        to timeout, later tiers only check what is already rendered. Hits
+        are kept in a small per-solve LRU so repeated lookups of the same
+        selector in the same context cost no extra CDP query.
+
+        Args:
+            context: Page or frame to search in
+            selector: CSS selector, usually a comma-separated union, or a
+                tuple of them in priority order
+            timeout: Seconds to wait for a match
+
+        Returns:
+            The matching element, or None if nothing matched
+        """
+        key = (id(context), selector)
+        element = self._element_cache.get(key)
+        if element is not None:
+            self._element_cache.move_to_end(key)
+            return element
+
+        tiers = (selector,) if isinstance(selector, str) else selector
+        element = None
+        for i, tier in enumerate(tiers):
+            try:
+                element = context(f"css:{tier}", timeout=timeout if i == 0 else 0)
+            except Exception as e:
+                print(f"Selector lookup failed: {e}")
+                continue
+            if element:
+                break
+
+        if not element:
+            return None
+
+        self._element_cache[key] = element
+        if len(self._element_cache) > self.ELEMENT_CACHE_SIZE:
+            self._element_cache.popitem(last=False)
+        return element
+
+    def _attr(self, element, name: str) -> Optional[str]:
+        """Read a single attribute with one callFunctionOn instead of fetching all attrs."""
+        return element.run_js("return this.getAttribute(arguments[0]);", name)
+
+    def _is_clickable(self, element) -> bool:
+        """Check visible and enabled in one callFunctionOn instead of two states() reads."""
+        return bool(element.run_js(
+            "return this.getClientRects().length > 0 && !this.disabled;"))
+
     def _human_like_type(self, element, text: str) -> None:
         """Simulate human-like typing behavior."""
         try:
@@ -625,11 +643,20 @@ class RecaptchaSolver:
             element.clear()
             self._human_like_delay(0.1, 0.3)
 
-            # Type character by character with random delays
-            for char in text:
-                element.input(char)
-                # Random delay between characters
-                time.sleep(random.uniform(0.05, 0.15))
+            # Focus the field and insert the whole answer in one CDP dispatch
+            element.focus()
+            self._human_like_delay(0.05, 0.15)
+            self.driver.run_cdp("Input.insertText", text=text)
+
+            # Take as long as typing it would: 0.05-0.15s per character
+            time.sleep(sum(self._rng.uniform(0.05, 0.15) for _ in text))
+
+            # The tab-level dispatch can miss a field inside the challenge
+            # frame without raising, so check the text actually landed
+            if element.run_js("return this.value;") != text:
+                print("Inserted text did not reach the field, typing it instead")
+                element.clear()
+                element.input(text)
 
         except Exception as e:
             print(f"Warning: Could not simulate human-like typing: {e}")
@@ -645,39 +672,27 @@ class RecaptchaSolver:
         Returns:
             str: Recognized text from the audio file
         """
-        mp3_path = os.path.join(
-            self.TEMP_DIR, f"{random.randrange(1, 1000)}.mp3")
-        wav_path = os.path.join(
-            self.TEMP_DIR, f"{random.randrange(1, 1000)}.wav")
-
         try:
             # Use proxy for downloading audio if available
-            if self.current_proxy:
-                import requests
-                proxy_dict = get_proxy_dict(self.current_proxy)
-                response = requests.get(
-                    audio_url, proxies=proxy_dict, timeout=30)
-                response.raise_for_status()
-
-                with open(mp3_path, 'wb') as f:
-                    f.write(response.content)
-
-                # Mark proxy as successful
-                mark_proxy_success(self.current_proxy)
-            else:
-                # Fallback to direct download
-                urllib.request.urlretrieve(audio_url, mp3_path)
+            proxy_dict = get_proxy_dict(
+                self.current_proxy) if self.current_proxy else None
 
-            sound = pydub.AudioSegment.from_mp3(mp3_path)
-            sound.export(wav_path, format="wav")
+            download_start = time.monotonic()
+            with _audio_session.get(audio_url, proxies=proxy_dict,
+                                    stream=True, timeout=(5, 20)) as response:
+                response.raise_for_status()
+                # Let libav pull bytes off the socket as it decodes
+                response.raw.decode_content = True
+                audio = self._decode_audio(response.raw)
 
-            recognizer = sr.Recognizer()
-            with sr.AudioFile(wav_path) as source:
-                audio = recognizer.record(source)
+            if self.current_proxy:
+                # Mark proxy as successful, with its download latency
+                mark_proxy_success(self.current_proxy,
+                                   time.monotonic() - download_start)
 
             # Use the correct speech recognition method - fix the method name
             try:
-                return recognizer.recognize_google(audio)
+                return _RECOGNIZER.recognize_google(audio)
             except sr.UnknownValueError:
                 raise Exception("Could not understand audio")
             except sr.RequestError as e:
@@ -689,85 +704,61 @@ class RecaptchaSolver:
             if self.current_proxy:
                 mark_proxy_failure(self.current_proxy)
             raise e
-        finally:
-            for path in (mp3_path, wav_path):
-                if os.path.exists(path):
-                    try:
-                        os.remove(path)
-                    except OSError:
-                        pass
+
+    def _decode_audio(self, source) -> sr.AudioData:
+        """Decode an MP3 stream straight to mono PCM at AUDIO_SAMPLE_RATE without touching disk.
+
+        Args:
+            source: File-like object holding the encoded audio
+
+        Returns:
+            sr.AudioData: PCM audio ready for speech recognition
+        """
+        resampler = av.AudioResampler(
+            format="s16", layout="mono", rate=self.AUDIO_SAMPLE_RATE)
+        chunks = []
+
+        with av.open(source) as container:
+            for frame in container.decode(audio=0):
+                for resampled in resampler.resample(frame):
+                    chunks.append(resampled.to_ndarray())
+            # Flush samples still buffered in the resampler
+            for resampled in resampler.resample(None):
+                chunks.append(resampled.to_ndarray())
+
+        if not chunks:
+            raise Exception("Audio file contained no decodable samples")
+
+        pcm = np.concatenate(chunks, axis=1).astype(np.int16, copy=False)
+        return sr.AudioData(pcm.tobytes(), self.AUDIO_SAMPLE_RATE, self.AUDIO_SAMPLE_WIDTH)
 
     def is_solved(self) -> bool:
         """Check if the captcha has been solved successfully."""
         try:
-            # Check multiple indicators of success
-            indicators = [
-                ".recaptcha-checkbox-checkmark",
-                ".recaptcha-checkbox-checked",
-                "[aria-checked='true']",
-                ".rc-anchor-checked"
-            ]
-
-            for indicator in indicators:
-                try:
-                    element = self.driver.ele(
-                        indicator, timeout=self.TIMEOUT_SHORT)
-                    if element and element.states().is_displayed:
-                        return True
-                except:
-                    continue
-
-            return False
+            # Check every indicator of success in one evaluation
+            return bool(self.driver.run_js(
+                "return Array.from(document.querySelectorAll(arguments[0]))"
+                ".some(e => e.getClientRects().length > 0);",
+                self._SOLVED_SEL))
         except Exception:
             return False
 
     def is_detected(self) -> bool:
         """Check if the bot has been detected."""
         try:
-            detection_indicators = [
-                "Try again later",
-                "unusual traffic",
-                "automated",
-                "robot",
-                "blocked",
-                "suspicious"
-            ]
-
-            for indicator in detection_indicators:
-                try:
-                    element = self.driver.ele(
-                        indicator, timeout=self.TIMEOUT_DETECTION)
-                    if element and element.states().is_displayed:
-                        return True
-                except:
-                    continue
-
-            return False
+            text = self.driver.run_js(
+                "return document.body ? document.body.innerText : '';")
+            return bool(text and self._DETECT_RE.search(text))
         except Exception:
             return False
 
     def get_token(self) -> Optional[str]:
         """Get the reCAPTCHA token if available."""
         try:
-            # Try multiple possible token locations
-            token_selectors = [
-                "#recaptcha-token",
-                "input[name='g-recaptcha-response']",
-                "[data-sitekey]"
-            ]
-
-            for selector in token_selectors:
-                try:
-                    element = self.driver.ele(
-                        selector, timeout=self.TIMEOUT_SHORT)
-                    if element:
-                        token = element.attrs.get(
-                            "value") or element.attrs.get("data-token")
-                        if token:
-                            return token
-                except:
-                    continue
-
-            return None
-        except Exception:
+            # First matching token location, resolved in one evaluation
+            token = self.driver.run_js(self._TOKEN_JS)
+        except JavaScriptError as e:
+            # Page-side failure only; lost connections propagate to the caller
+            print(f"Warning: Could not read reCAPTCHA token: {e}")
             return None
+        return token or None
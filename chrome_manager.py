@@ -8,24 +8,83 @@ and status checking.
 """
 
 import os
+import errno
 import sys
+import selectors
+import signal
+import socket
+import stat
 import time
 import json
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, List, Tuple
 import logging
 
+try:
+    import orjson as _json_impl  # Optional faster parser for /json/version
+except ImportError:
+    _json_impl = json
+
 # Configure logging
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# connect_ex codes meaning a non-blocking connect is still under way
+# (Windows reports WSAEWOULDBLOCK rather than EINPROGRESS)
+_CONNECT_IN_PROGRESS = frozenset(
+    code for code in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN,
+                      getattr(errno, 'WSAEWOULDBLOCK', None))
+    if code is not None)
+
+# Static Chrome flags; start_chrome only adds port, profile dir and headless mode
+CHROME_BASE_ARGS = (
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-default-apps",
+    "--disable-popup-blocking",
+    "--disable-web-security",
+    "--disable-features=VizDisplayCompositor",
+    "--disable-dev-shm-usage",
+    "--disable-gpu",
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+    "--disable-ipc-flooding-protection",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-extensions-except=",
+    "--disable-plugins-discovery",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-background-networking",
+    "--disable-client-side-phishing-detection",
+    "--disable-component-extensions-with-background-pages",
+    "--disable-domain-reliability",
+    "--disable-features=AudioServiceOutOfProcess,TranslateUI",
+    "--disable-hang-monitor",
+    "--disable-prompt-on-repost",
+    "--disable-sync-preferences",
+    "--metrics-recording-only",
+    "--safebrowsing-disable-auto-update",
+    "--window-size=1920,1080",
+    "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
+    "--disable-logging",
+    "--log-level=3",
+    "--silent-launch",
+)
+
 
 class ChromeManager:
     """Manages a standalone Chrome instance for the project."""
 
+    # Seconds a debug-port probe result is reused before probing again
+    PROBE_CACHE_TTL = 0.5
+
     def __init__(self, project_dir: Optional[str] = None):
         """
         Initialize the Chrome manager.
@@ -39,6 +98,18 @@ class ChromeManager:
         self.user_data_dir = self.project_dir / "chrome_user_data"
         self.debug_port = 9222
         self.process = None
+        # str forms used on hot paths so Path objects aren't re-stringified per call
+        self._chrome_exec_str = str(self.chrome_exec)
+        self._user_data_dir_str = str(self.user_data_dir)
+        self._chrome_resolved: Optional[str] = None
+
+        # Create user data directory once rather than on every start
+        self.user_data_dir.mkdir(parents=True, exist_ok=True)
+        # (monotonic timestamp, running, info) of the last debug-port probe
+        self._probe_cache = (0.0, False, None)
+        # Keep-alive session so repeated probes reuse one loopback connection
+        self._session = requests.Session()
+        self._session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
 
     def is_chrome_installed(self) -> bool:
         """
@@ -47,7 +118,12 @@ class ChromeManager:
         Returns:
             True if Chrome executable exists, False otherwise.
         """
-        return self.chrome_exec.exists() or self.chrome_exec.is_symlink()
+        try:
+            # A single lstat covers both "exists" and "is a (possibly dangling) symlink"
+            os.lstat(self._chrome_exec_str)
+            return True
+        except OSError:
+            return False
 
     def get_chrome_path(self) -> Optional[str]:
         """
@@ -56,25 +132,132 @@ class ChromeManager:
         Returns:
             Path to Chrome executable or None if not found.
         """
-        if self.is_chrome_installed():
-            if self.chrome_exec.is_symlink():
-                return str(self.chrome_exec.resolve())
-            return str(self.chrome_exec)
-        return None
+        try:
+            st = os.lstat(self._chrome_exec_str)
+        except OSError:
+            self._chrome_resolved = None
+            return None
+
+        if self._chrome_resolved is None:
+            if stat.S_ISLNK(st.st_mode):
+                self._chrome_resolved = os.path.realpath(self._chrome_exec_str)
+            else:
+                self._chrome_resolved = self._chrome_exec_str
+        return self._chrome_resolved
+
+    def _probe_once(self, use_cache: bool = True) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Query the debug port once and derive both liveness and version info.
+
+        Args:
+            use_cache: Reuse a probe result younger than PROBE_CACHE_TTL.
+
+        Returns:
+            Tuple of (running, Chrome info dictionary or None).
+        """
+        checked_at, running, info = self._probe_cache
+        # A cached TCP-only probe says "running" without info; fetch it then
+        if use_cache and time.monotonic() - checked_at < self.PROBE_CACHE_TTL \
+           and (info is not None or not running):
+            return running, info
+
+        running, info = False, None
+        try:
+            response = self._session.get(
+                f"http://localhost:{self.debug_port}/json/version", timeout=2)
+            if response.status_code == 200:
+                running = True
+                info = _json_impl.loads(response.content)
+        except (requests.RequestException, requests.Timeout, json.JSONDecodeError):
+            pass
+
+        self._probe_cache = (time.monotonic(), running, info)
+        return running, info
+
+    def _port_open(self, timeout: float = 0.1) -> bool:
+        """
+        Check whether anything accepts TCP connections on the debug port.
+
+        Args:
+            timeout: Connect timeout in seconds.
+
+        Returns:
+            True if the port accepted the connection, False otherwise.
+        """
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            return sock.connect_ex(("127.0.0.1", self.debug_port)) == 0
+
+    @staticmethod
+    def probe_ports(ports: Iterable[int], timeout: float = 0.1) -> Dict[int, bool]:
+        """
+        Check several debug ports at once with non-blocking connects.
 
-    def is_chrome_running(self) -> bool:
+        All connects are started up front and their completion is collected
+        through one selector, so N ports cost about one timeout, not N.
+
+        Args:
+            ports: Debug ports to check.
+            timeout: Seconds to wait for all connects to complete.
+
+        Returns:
+            Dictionary mapping each port to whether it accepted a connection.
+        """
+        results: Dict[int, bool] = {}
+        pending: Dict[int, socket.socket] = {}
+
+        with selectors.DefaultSelector() as selector:
+            for port in ports:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+                rc = sock.connect_ex(("127.0.0.1", port))
+                if rc in _CONNECT_IN_PROGRESS:
+                    selector.register(sock, selectors.EVENT_WRITE, port)
+                    pending[port] = sock
+                else:
+                    results[port] = rc == 0
+                    sock.close()
+
+            deadline = time.monotonic() + timeout
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in selector.select(remaining):
+                    sock = key.fileobj
+                    results[key.data] = sock.getsockopt(
+                        socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                    selector.unregister(sock)
+                    sock.close()
+                    del pending[key.data]
+
+            # Anything still connecting after the timeout counts as down
+            for port, sock in pending.items():
+                results[port] = False
+                selector.unregister(sock)
+                sock.close()
+
+        return results
+
+    def is_chrome_running(self, use_cache: bool = True) -> bool:
         """
         Check if Chrome is running on the debug port.
 
+        Args:
+            use_cache: Reuse a probe result younger than PROBE_CACHE_TTL.
+
         Returns:
             True if Chrome is running, False otherwise.
         """
-        try:
-            response = requests.get(
-                f"http://localhost:{self.debug_port}/json/version", timeout=2)
-            return response.status_code == 200
-        except (requests.RequestException, requests.Timeout):
-            return False
+        checked_at, running, cached_info = self._probe_cache
+        if use_cache and time.monotonic() - checked_at < self.PROBE_CACHE_TTL:
+            return running
+
+        # A TCP connect is enough to know the debug server is up; keep the
+        # cached info only while Chrome stays up
+        running = self._port_open()
+        self._probe_cache = (time.monotonic(), running, cached_info if running else None)
+        return running
 
     def get_chrome_info(self) -> Optional[Dict[str, Any]]:
         """
@@ -83,14 +266,37 @@ class ChromeManager:
         Returns:
             Chrome info dictionary or None if Chrome is not running.
         """
-        try:
-            response = requests.get(
-                f"http://localhost:{self.debug_port}/json/version", timeout=2)
-            if response.status_code == 200:
-                return response.json()
-        except (requests.RequestException, requests.Timeout, json.JSONDecodeError):
-            pass
-        return None
+        return self._probe_once()[1]
+
+    def _invalidate_probe_cache(self) -> None:
+        """Forget cached probe results after Chrome is started or stopped."""
+        self._probe_cache = (0.0, False, None)
+
+    def _find_debug_port_pids(self) -> List[int]:
+        """
+        Find processes launched with our remote debugging port by scanning /proc.
+
+        Returns:
+            List of matching process IDs.
+        """
+        marker = f"--remote-debugging-port={self.debug_port}".encode()
+        own_pid = os.getpid()
+        pids = []
+
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit() or int(entry) == own_pid:
+                continue
+            try:
+                with open(f"/proc/{entry}/cmdline", "rb") as f:
+                    cmdline = f.read()
+            except OSError:
+                continue  # Process exited or is not ours to inspect
+            # Arguments are NUL-separated; compare whole arguments so port
+            # 9222 doesn't also match 92220
+            if marker in cmdline.split(b"\x00"):
+                pids.append(int(entry))
+
+        return pids
 
     def kill_existing_chrome(self) -> bool:
         """
@@ -100,23 +306,51 @@ class ChromeManager:
             True if successful, False otherwise.
         """
         try:
-            # Kill processes on the debug port
-            subprocess.run([
-                "lsof", "-ti", f":{self.debug_port}"
-            ], capture_output=True, text=True, check=False)
-
-            # Kill Chrome processes
-            subprocess.run([
-                "pkill", "-f", f"chrome.*{self.debug_port}"
-            ], capture_output=True, text=True, check=False)
-
-            # Wait for processes to terminate
-            time.sleep(2)
+            if not os.path.isdir("/proc"):
+                # No procfs (e.g. macOS): fall back to pkill
+                subprocess.run([
+                    "pkill", "-f", f"chrome.*{self.debug_port}"
+                ], capture_output=True, text=True, check=False)
+
+                # Wait for processes to terminate
+                time.sleep(2)
+                return True
+
+            pids = self._find_debug_port_pids()
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+            # Give Chrome a second to exit cleanly, then force it
+            deadline = time.monotonic() + 1
+            while pids and time.monotonic() < deadline:
+                time.sleep(0.05)
+                pids = [pid for pid in pids if self._pid_alive(pid)]
+
+            for pid in pids:
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+
             return True
-        except Exception as e:
-            logger.error(f"Failed to kill existing Chrome: {e}")
+        except Exception:
+            logger.exception("Failed to kill existing Chrome")
             return False
 
+    @staticmethod
+    def _pid_alive(pid: int) -> bool:
+        """Check whether a process still exists without signalling it."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
     def start_chrome(self, headless: bool = True, wait_timeout: int = 30) -> bool:
         """
         Start the standalone Chrome instance.
@@ -133,6 +367,7 @@ class ChromeManager:
                 "Chrome is not installed. Run setup_standalone_chrome.sh first.")
             return False
 
+        self._invalidate_probe_cache()
         if self.is_chrome_running():
             logger.info("Chrome is already running.")
             return True
@@ -140,49 +375,12 @@ class ChromeManager:
         # Kill any existing Chrome processes
         self.kill_existing_chrome()
 
-        # Create user data directory
-        self.user_data_dir.mkdir(exist_ok=True)
-
         # Build Chrome command
         cmd = [
-            str(self.chrome_exec),
+            self._chrome_exec_str,
             f"--remote-debugging-port={self.debug_port}",
-            "--no-first-run",
-            "--no-default-browser-check",
-            "--disable-default-apps",
-            "--disable-popup-blocking",
-            "--disable-web-security",
-            "--disable-features=VizDisplayCompositor",
-            "--disable-dev-shm-usage",
-            "--disable-gpu",
-            "--no-sandbox",
-            "--disable-setuid-sandbox",
-            "--disable-background-timer-throttling",
-            "--disable-backgrounding-occluded-windows",
-            "--disable-renderer-backgrounding",
-            "--disable-features=TranslateUI",
-            "--disable-ipc-flooding-protection",
-            "--disable-blink-features=AutomationControlled",
-            "--disable-extensions-except=",
-            "--disable-plugins-discovery",
-            "--disable-sync",
-            "--disable-translate",
-            "--disable-background-networking",
-            "--disable-client-side-phishing-detection",
-            "--disable-component-extensions-with-background-pages",
-            "--disable-domain-reliability",
-            "--disable-features=AudioServiceOutOfProcess,TranslateUI",
-            "--disable-hang-monitor",
-            "--disable-prompt-on-repost",
-            "--disable-sync-preferences",
-            "--metrics-recording-only",
-            "--safebrowsing-disable-auto-update",
-            f"--user-data-dir={self.user_data_dir}",
-            "--window-size=1920,1080",
-            "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "--disable-logging",
-            "--log-level=3",
-            "--silent-launch"
+            f"--user-data-dir={self._user_data_dir_str}",
+            *CHROME_BASE_ARGS
         ]
 
         if headless:
@@ -190,27 +388,32 @@ class ChromeManager:
 
         try:
             logger.info("Starting Chrome...")
+            # Python's own fds are non-inheritable (PEP 446), so skip the
+            # close-every-fd loop that close_fds=True does in the child
             self.process = subprocess.Popen(
                 cmd,
                 stdout=subprocess.DEVNULL,
                 stderr=subprocess.DEVNULL,
+                close_fds=False,
                 start_new_session=True
             )
 
-            # Wait for Chrome to start
-            start_time = time.time()
-            while time.time() - start_time < wait_timeout:
-                if self.is_chrome_running():
+            # Wait for Chrome to start, polling tightly at first
+            deadline = time.monotonic() + wait_timeout
+            delay = 0.025
+            while time.monotonic() < deadline:
+                if self.is_chrome_running(use_cache=False):
                     logger.info(
-                        f"✅ Chrome started successfully on port {self.debug_port}")
+                        "✅ Chrome started successfully on port %d", self.debug_port)
                     return True
-                time.sleep(1)
+                time.sleep(delay)
+                delay = min(delay * 2, 0.5)
 
             logger.error("❌ Chrome failed to start within timeout")
             return False
 
-        except Exception as e:
-            logger.error(f"Failed to start Chrome: {e}")
+        except Exception:
+            logger.exception("Failed to start Chrome")
             return False
 
     def stop_chrome(self) -> bool:
@@ -228,12 +431,16 @@ class ChromeManager:
 
             # Kill any remaining Chrome processes
             self.kill_existing_chrome()
+            self._invalidate_probe_cache()
+
+            # Drop the pooled connection to the old debug server
+            self._session.close()
 
             logger.info("✅ Chrome stopped successfully")
             return True
 
-        except Exception as e:
-            logger.error(f"Failed to stop Chrome: {e}")
+        except Exception:
+            logger.exception("Failed to stop Chrome")
             return False
 
     def restart_chrome(self, headless: bool = True) -> bool:
@@ -247,6 +454,7 @@ class ChromeManager:
             True if Chrome restarted successfully, False otherwise.
         """
         logger.info("Restarting Chrome...")
+        self._invalidate_probe_cache()
         self.stop_chrome()
         time.sleep(2)
         return self.start_chrome(headless=headless)
@@ -258,19 +466,18 @@ class ChromeManager:
         Returns:
             Dictionary with Chrome status information.
         """
+        running, chrome_info = self._probe_once()
         status = {
             "installed": self.is_chrome_installed(),
-            "running": self.is_chrome_running(),
+            "running": running,
             "debug_port": self.debug_port,
             "chrome_path": self.get_chrome_path(),
-            "user_data_dir": str(self.user_data_dir)
+            "user_data_dir": self._user_data_dir_str
         }
 
-        if status["running"]:
-            chrome_info = self.get_chrome_info()
-            if chrome_info:
-                status["version"] = chrome_info.get("Browser", "Unknown")
-                status["debug_url"] = f"http://localhost:{self.debug_port}"
+        if chrome_info:
+            status["version"] = chrome_info.get("Browser", "Unknown")
+            status["debug_url"] = f"http://localhost:{self.debug_port}"
 
         return status
 
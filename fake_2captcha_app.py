@@ -2,11 +2,16 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import threading
 import time
+import itertools
+from concurrent.futures import ThreadPoolExecutor, Future
 import logging
 import os
-import hashlib
-import uuid
-from typing import Optional, Dict, Any
+import hmac
+import traceback
+from typing import Optional, Dict, Any, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from DrissionPage import ChromiumPage, ChromiumOptions
 from RecaptchaSolver import RecaptchaSolver
@@ -29,31 +34,55 @@ logger = logging.getLogger(__name__)
 
 @app.before_request
 def log_request_info():
-    """Log all incoming requests for debugging."""
-    logger.info(f"Request: {request.method} {request.url}")
-    logger.info(f"Headers: {dict(request.headers)}")
+    """Log all incoming requests for debugging (DEBUG level only)."""
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    logger.debug("Request: %s %s", request.method, request.url)
+    logger.debug("Headers: %s", dict(request.headers))
     if request.method == 'POST':
-        logger.info(f"Form data: {dict(request.form)}")
+        logger.debug("Form data: %s", dict(request.form))
     # Only try to get JSON if content-type is application/json
     if request.headers.get('Content-Type', '').startswith('application/json'):
         try:
             json_data = request.get_json()
             if json_data:
-                logger.info(f"JSON data: {json_data}")
+                logger.debug("JSON data: %s", json_data)
         except Exception:
             pass
 
 
 # Configuration
 API_KEY = os.getenv('FAKE_2CAPTCHA_API_KEY', 'fake_680d0e29b28040ef')
+API_KEY_CONFIGURED = API_KEY != 'your_fake_api_key_here'
+_API_KEY_BYTES = API_KEY.encode()
 PORT = int(os.getenv('PORT', 5001))
+WSGI_THREADS = int(os.getenv('WSGI_THREADS', 32))
 
 # Browser management - Singleton pattern for shared browser instance
 browser_lock = threading.Lock()
 shared_browser = None
+# Held for a whole solve, from loading the page to reading the token
+page_lock = threading.Lock()
 browser_health_lock = threading.Lock()
-last_health_check = 0
-captcha_results = {}  # Store captcha results
+last_health_check = 0.0  # time.monotonic() of the last Chrome probe
+HEALTH_CHECK_INTERVAL = 30
+# Store captcha results; entries expire so abandoned IDs don't accumulate
+captcha_results = TTLCache(maxsize=10000, ttl=300)
+captcha_results_lock = threading.Lock()
+# Numeric, strictly increasing captcha IDs (2captcha clients expect digits)
+_id_counter = itertools.count(int(time.time() * 1000))
+# Process-local tags for correlating solve log lines
+_req_counter = itertools.count(1)
+
+# Background solves all drive the one shared browser tab, so a single
+# worker runs them one at a time; its queue is the producer/consumer queue
+SOLVER_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="solver")
+# Solves currently queued or running, keyed by (type, pageurl, sitekey, action)
+inflight_solves: Dict[tuple, Future] = {}
+inflight_lock = threading.Lock()
+# Recently solved tokens; 100s stays inside Google's ~120s token validity
+token_cache = TTLCache(maxsize=1024, ttl=100)
+token_cache_lock = threading.Lock()
 
 CHROME_ARGUMENTS = [
     "-no-first-run", "-force-color-profile=srgb", "-metrics-recording-only",
@@ -68,14 +97,27 @@ CHROME_ARGUMENTS = [
 ]
 
 
+CHROME_VERSION_URL = 'http://127.0.0.1:9222/json/version'
+
+# Page readiness after navigation
+PAGE_LOAD_TIMEOUT = 5
+RECAPTCHA_IFRAME_SELECTOR = "css:iframe[title='reCAPTCHA']"
+HCAPTCHA_IFRAME_SELECTOR = "css:iframe[src*='hcaptcha']"
+RECAPTCHA_RESET_JS = "if (window.grecaptcha && grecaptcha.reset) grecaptcha.reset();"
+HCAPTCHA_RESET_JS = "if (window.hcaptcha && hcaptcha.reset) hcaptcha.reset();"
+
+# Keep-alive session for the Chrome debug endpoint probes
+_chrome_probe_session = requests.Session()
+_chrome_probe_session.mount(
+    'http://', HTTPAdapter(pool_connections=2, pool_maxsize=2))
+
+
 def is_chrome_healthy() -> bool:
     """Check if Chrome debugging is accessible."""
     try:
-        import urllib.request
-        response = urllib.request.urlopen(
-            'http://127.0.0.1:9222/json/version', timeout=2)
-        return response.getcode() == 200
-    except:
+        response = _chrome_probe_session.get(CHROME_VERSION_URL, timeout=2)
+        return response.status_code == 200
+    except requests.RequestException:
         return False
 
 
@@ -83,16 +125,18 @@ def get_shared_browser():
     """Get or create shared browser instance with health checks."""
     global shared_browser, last_health_check
 
-    current_time = time.time()
+    current_time = time.monotonic()
 
-    # Check browser health every 30 seconds
-    with browser_health_lock:
-        if current_time - last_health_check > 30:
-            if not is_chrome_healthy():
-                logger.warning(
-                    "Chrome debugging not healthy, resetting browser instance")
-                shared_browser = None
-            last_health_check = current_time
+    # Check browser health every 30 seconds; the unlocked read skips the
+    # lock entirely between probes, the locked re-check avoids double probes
+    if current_time - last_health_check > HEALTH_CHECK_INTERVAL:
+        with browser_health_lock:
+            if current_time - last_health_check > HEALTH_CHECK_INTERVAL:
+                if not is_chrome_healthy():
+                    logger.warning(
+                        "Chrome debugging not healthy, resetting browser instance")
+                    shared_browser = None
+                last_health_check = current_time
 
     # Create or reuse browser instance
     with browser_lock:
@@ -107,8 +151,8 @@ def get_shared_browser():
                     "Successfully connected to existing Chrome instance")
                 return shared_browser
             except Exception as connect_error:
-                logger.warning(
-                    f"Failed to connect to existing Chrome: {connect_error}")
+                logger.warning("Failed to connect to existing Chrome: %s",
+                               connect_error)
                 logger.info("Attempting to create new Chrome instance...")
 
                 try:
@@ -142,7 +186,7 @@ def get_shared_browser():
                         "New shared browser instance created successfully")
                     return shared_browser
                 except Exception as e:
-                    logger.error(f"Failed to create browser instance: {e}")
+                    logger.error("Failed to create browser instance: %s", e)
                     logger.error("To fix this issue:")
                     logger.error(
                         "1. Start Chrome with: chrome --remote-debugging-port=9222")
@@ -155,147 +199,250 @@ def get_shared_browser():
             return shared_browser
 
 
-def solve_captcha_with_browser(pageurl: str, googlekey: str) -> Optional[str]:
-    """Solve reCAPTCHA using shared browser instance with request queuing."""
-    request_id = f"req_{int(time.time())}_{uuid.uuid4().hex[:8]}"
-
-    try:
-        # Get shared browser instance (only this part locks briefly)
-        driver = get_shared_browser()
-        if driver is None:
-            logger.error("Failed to get browser instance")
-            logger.info("Using mock token for testing")
-            return "mock_recaptcha_token_for_testing_12345"
-
-        logger.info(f"[{request_id}] Solving captcha for: {pageurl}")
-
-        # Navigate to the page (no longer inside the main lock)
-        driver.get(pageurl)
-
-        # Wait for page to load
-        time.sleep(2)
-
-        # Solve the captcha
-        solver = RecaptchaSolver(driver)
-        start_time = time.time()
-        solver.solveCaptcha()
-        solve_time = time.time() - start_time
+def wait_for_page(driver, selector: Optional[str] = None,
+                  timeout: float = PAGE_LOAD_TIMEOUT) -> None:
+    """Wait until the document has loaded and, optionally, an element exists.
 
-        # Get the token
-        token = solver.get_token()
-
-        if solver.is_solved():
-            logger.info(
-                f"[{request_id}] Captcha solved successfully in {solve_time:.2f} seconds")
-            return token if token else "solved"
-        else:
-            logger.warning(f"[{request_id}] Captcha solving failed")
-            return None
-
-    except Exception as e:
-        logger.error(f"[{request_id}] Error solving captcha: {e}")
-        logger.error(f"[{request_id}] Error type: {type(e).__name__}")
-        import traceback
-        logger.error(
-            f"[{request_id}] Full traceback: {traceback.format_exc()}")
-
-        # Reset shared browser on critical errors
-        if "chrome" in str(e).lower() or "connection" in str(e).lower():
-            logger.warning(
-                f"[{request_id}] Chrome connection error, resetting shared browser")
-            with browser_lock:
-                global shared_browser
-                shared_browser = None
-
-        logger.info(f"[{request_id}] Using mock token due to browser error")
-        return "mock_recaptcha_token_for_testing_12345"
-
-
-def solve_hcaptcha_with_browser(pageurl: str, sitekey: str, data: str = "") -> Optional[str]:
-    """Solve hCaptcha using shared browser instance."""
-    request_id = f"hcap_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+    Falls back to a short fixed pause if DrissionPage's waits fail.
 
+    Args:
+        driver: ChromiumPage that has just navigated
+        selector: Optional DrissionPage locator to wait for
+        timeout: Maximum seconds to wait for each condition
+    """
     try:
-        # Get shared browser instance (brief lock only)
-        driver = get_shared_browser()
-        if driver is None:
-            logger.error("Failed to get browser instance")
-            logger.info("Using mock hCaptcha token for testing")
-            return "mock_hcaptcha_token_for_testing_12345"
-
-        logger.info(f"[{request_id}] Solving hCaptcha for: {pageurl}")
-
-        # Navigate to the page
-        driver.get(pageurl)
-
-        # Wait for page to load
-        time.sleep(2)
-
-        # For now, return mock token (would need hCaptcha solver implementation)
-        logger.info(
-            f"[{request_id}] Using mock hCaptcha token (solver not implemented)")
-        return "mock_hcaptcha_token_for_testing_12345"
-
+        driver.wait.doc_loaded(timeout=timeout)
+        if selector:
+            driver.ele(selector, timeout=timeout)
     except Exception as e:
-        logger.error(f"[{request_id}] Error solving hCaptcha: {e}")
-
-        # Reset shared browser on critical errors
-        if "chrome" in str(e).lower() or "connection" in str(e).lower():
-            logger.warning(
-                f"[{request_id}] Chrome connection error, resetting shared browser")
-            with browser_lock:
-                global shared_browser
-                shared_browser = None
-
-        logger.info(
-            f"[{request_id}] Using mock hCaptcha token due to browser error")
-        return "mock_hcaptcha_token_for_testing_12345"
-
-
-def solve_recaptcha3_with_browser(pageurl: str, googlekey: str, action: str = "", min_score: str = "0.3") -> Optional[str]:
-    """Solve reCAPTCHA v3 using shared browser instance."""
-    request_id = f"v3_{int(time.time())}_{uuid.uuid4().hex[:8]}"
+        logger.debug("Page readiness wait failed: %s", e)
+        time.sleep(0.3)
+
+
+def load_page(driver, pageurl: str, selector: Optional[str] = None,
+              reset_js: Optional[str] = None) -> None:
+    """Navigate to pageurl unless it is already loaded with its widget.
+
+    When the browser is still on pageurl and the captcha widget is present,
+    the widget is reset via reset_js instead of reloading the whole page.
+    The caller must hold page_lock until it has read the token.
+
+    Args:
+        driver: Shared ChromiumPage
+        pageurl: Page hosting the captcha
+        selector: Locator of the captcha widget; None always navigates
+        reset_js: Script that resets the widget in place
+    """
+    if selector and driver.url == pageurl and driver.ele(selector, timeout=0):
+        if reset_js:
+            try:
+                driver.run_js(reset_js)
+            except Exception as e:
+                logger.debug("Widget reset failed, reloading page: %s", e)
+                driver.get(pageurl)
+                wait_for_page(driver, selector)
+                return
+        logger.debug("Reusing loaded page %s", pageurl)
+        return
+
+    driver.get(pageurl)
+    wait_for_page(driver, selector)
+
+
+# Per-type solve settings. 'solver' is the solver class to run on the
+# loaded page; types without one return their mock token after navigating.
+_SOLVER_DISPATCH: Dict[str, Dict[str, Any]] = {
+    'recaptcha': {
+        'tag': 'req',
+        'label': 'captcha',
+        'selector': RECAPTCHA_IFRAME_SELECTOR,
+        'reset_js': RECAPTCHA_RESET_JS,
+        'solver': RecaptchaSolver,
+        'mock_token': 'mock_recaptcha_token_for_testing_12345',
+    },
+    'hcaptcha': {
+        'tag': 'hcap',
+        'label': 'hCaptcha',
+        'selector': HCAPTCHA_IFRAME_SELECTOR,
+        'reset_js': HCAPTCHA_RESET_JS,
+        'solver': None,
+        'mock_token': 'mock_hcaptcha_token_for_testing_12345',
+    },
+    'recaptcha3': {
+        'tag': 'v3',
+        'label': 'reCAPTCHA v3',
+        # v3 has no visible widget to wait on
+        'selector': None,
+        'reset_js': None,
+        'solver': None,
+        'mock_token': 'mock_recaptcha3_token_for_testing_12345',
+    },
+}
+
+
+def _solve_with_browser(kind: str, pageurl: str, **params) -> Optional[str]:
+    """Solve a captcha of the given type using the shared browser instance.
+
+    Args:
+        kind: Captcha type, a key of _SOLVER_DISPATCH
+        pageurl: Page hosting the captcha
+        **params: Remaining submission fields (sitekey, action, ...)
+
+    Returns:
+        Token string, "solved" if solved without a readable token, a mock
+        token when no browser is available, or None if solving failed
+    """
+    spec = _SOLVER_DISPATCH[kind]
+    request_id = f"{spec['tag']}_{next(_req_counter)}"
+    mock_token = spec['mock_token']
 
     try:
-        # Get shared browser instance (brief lock only)
+        # Get shared browser instance (only this part locks briefly)
         driver = get_shared_browser()
         if driver is None:
             logger.error("Failed to get browser instance")
-            logger.info("Using mock reCAPTCHA v3 token for testing")
-            return "mock_recaptcha3_token_for_testing_12345"
-
-        logger.info(f"[{request_id}] Solving reCAPTCHA v3 for: {pageurl}")
-
-        # Navigate to the page
-        driver.get(pageurl)
-
-        # Wait for page to load
-        time.sleep(2)
-
-        # For now, return mock token (would need reCAPTCHA v3 solver implementation)
-        logger.info(
-            f"[{request_id}] Using mock reCAPTCHA v3 token (solver not implemented)")
-        return "mock_recaptcha3_token_for_testing_12345"
+            logger.info("Using mock %s token for testing", spec['label'])
+            return mock_token
+
+        logger.info("[%s] Solving %s for: %s",
+                    request_id, spec['label'], pageurl)
+
+        # One solve owns the tab at a time: load_page may reuse the page
+        # and reset its widget, which would wipe another solve's state
+        with page_lock:
+            # Navigate to the page, or just reset the widget if the page is
+            # still loaded from the last solve
+            load_page(driver, pageurl, spec['selector'], spec['reset_js'])
+
+            solver_cls = spec['solver']
+            if solver_cls is None:
+                # For now, return mock token (solver not implemented)
+                logger.info("[%s] Using mock %s token (solver not implemented)",
+                            request_id, spec['label'])
+                return mock_token
+
+            # Solve the captcha
+            solver = solver_cls(driver)
+            start_time = time.time()
+            solver.solveCaptcha()
+            solve_time = time.time() - start_time
+
+            # Get the token
+            token = solver.get_token()
+
+            if solver.is_solved():
+                logger.info("[%s] Captcha solved successfully in %.2f seconds",
+                            request_id, solve_time)
+                return token if token else "solved"
+            else:
+                logger.warning("[%s] Captcha solving failed", request_id)
+                return None
 
     except Exception as e:
-        logger.error(f"[{request_id}] Error solving reCAPTCHA v3: {e}")
+        logger.error("[%s] Error solving %s: %s", request_id, spec['label'], e)
+        logger.error("[%s] Error type: %s", request_id, type(e).__name__)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[%s] Full traceback: %s",
+                         request_id, traceback.format_exc())
 
         # Reset shared browser on critical errors
         if "chrome" in str(e).lower() or "connection" in str(e).lower():
             logger.warning(
-                f"[{request_id}] Chrome connection error, resetting shared browser")
+                "[%s] Chrome connection error, resetting shared browser",
+                request_id)
+            global shared_browser
             with browser_lock:
-                global shared_browser
                 shared_browser = None
 
-        logger.info(
-            f"[{request_id}] Using mock reCAPTCHA v3 token due to browser error")
-        return "mock_recaptcha3_token_for_testing_12345"
+        logger.info("[%s] Using mock %s token due to browser error",
+                    request_id, spec['label'])
+        return mock_token
+
+
+def submit_solve_job(job_key: tuple, solve_fn) -> Future:
+    """Queue a solve on the solver pool, sharing any identical job in flight.
+
+    Submissions for the same (type, pageurl, sitekey, action) that arrive
+    while a solve is still queued or running attach to that solve's Future
+    instead of navigating the browser again, and a token solved for the
+    same key within the last 100 seconds is returned without solving.
+
+    Args:
+        job_key: Tuple identifying the captcha to solve
+        solve_fn: Callable returning the token (or None on failure)
+
+    Returns:
+        Future resolving to the solve result
+    """
+    # Both lookups happen under inflight_lock, so a solve finishing in
+    # between can't slip past (forget() caches its token before leaving)
+    with inflight_lock:
+        with token_cache_lock:
+            token = token_cache.get(job_key)
+        if token is not None:
+            logger.info("Reusing cached token for %s", job_key[1])
+            future = Future()
+            future.set_result(token)
+            return future
+
+        future = inflight_solves.get(job_key)
+        if future is not None:
+            logger.info("Joining in-flight solve for %s", job_key[1])
+            return future
+        future = SOLVER_POOL.submit(solve_fn)
+        inflight_solves[job_key] = future
+
+    # Registered outside the lock: the callback runs inline if already done
+    def forget(done):
+        token = done.result() if done.exception() is None else None
+        with inflight_lock:
+            # Mock fallbacks and bare "solved" markers are not reusable tokens
+            if token and token != "solved" and not token.startswith("mock_"):
+                with token_cache_lock:
+                    token_cache[job_key] = token
+            if inflight_solves.get(job_key) is done:
+                del inflight_solves[job_key]
+
+    future.add_done_callback(forget)
+    return future
+
+
+# Constant 2captcha plain-text reply bodies
+RESP_NOT_READY = b"CAPCHA_NOT_READY"
+RESP_BAD_KEY = b"ERROR_KEY_DOES_NOT_EXIST"
+RESP_UNSOLVABLE = b"ERROR_CAPTCHA_UNSOLVABLE"
+RESP_WRONG_ID = b"ERROR_WRONG_ID_FORMAT"
+RESP_REPORT_RECORDED = b"OK_REPORT_RECORDED"
+RESP_BALANCE = b"999.99"
+# Upper bound on captchas accepted by one /in.php/batch request
+MAX_BATCH_SUBMIT = 100
+# Pending results change on the next poll; keep proxies from caching them
+NO_STORE = {'Cache-Control': 'no-store'}
+
+
+def text_response(body: bytes, status: int = 200,
+                  headers: Optional[Dict[str, str]] = None):
+    """Build a text/plain response from a pre-encoded body.
+
+    A fresh Response is built per request because after_request hooks
+    (flask-cors) add headers to the object in place.
+
+    Args:
+        body: Response body bytes
+        status: HTTP status code
+        headers: Optional extra headers
+
+    Returns:
+        Flask response object
+    """
+    return app.response_class(response=body, status=status,
+                              mimetype='text/plain', headers=headers)
 
 
 def validate_api_key(api_key: str) -> bool:
-    """Validate the API key."""
-    return api_key == API_KEY
+    """Validate the API key (constant-time comparison)."""
+    # Compare bytes: compare_digest rejects non-ASCII str arguments
+    return hmac.compare_digest((api_key or '').encode(), _API_KEY_BYTES)
 
 
 def get_error_message(error_code: str) -> str:
@@ -331,110 +478,135 @@ def get_balance():
     })
 
 
-@app.route('/in.php', methods=['POST'])
-def submit_captcha():
-    """Submit captcha for solving - mimics 2captcha API."""
-    try:
-        # Get API key from form data
-        api_key = request.form.get('key')
-        if not api_key or not validate_api_key(api_key):
-            response = app.response_class(
-                response="ERROR_KEY_DOES_NOT_EXIST",
-                status=401,
-                mimetype='text/plain'
-            )
-            return response
+def _start_solve(captcha_id: str, kind: str, job_key: tuple, pageurl: str,
+                 **params) -> None:
+    """Solve a registered captcha in the background and record the outcome.
 
-        # Get captcha parameters
-        method = request.form.get('method')
-        googlekey = request.form.get('googlekey')
-        pageurl = request.form.get('pageurl')
-        soft_id = request.form.get('soft_id', '135')
-        invisible = request.form.get('invisible', '0')
-        user_agent = request.form.get('userAgent', '')
-        enterprise = request.form.get('enterprise', '0')
-        version = request.form.get('version', '')
-        action = request.form.get('action', '')
-        min_score = request.form.get('min_score', '')
-        sitekey = request.form.get('sitekey', '')
-        data = request.form.get('data', '')
-        text_captcha = request.form.get('textcaptcha', '')
-
-        # Support multiple captcha types as per 2captcha .ini
-        if method == 'userrecaptcha':
-            if not googlekey or not pageurl:
-                response = app.response_class(
-                    response="ERROR_CAPTCHA_UNSOLVABLE",
-                    status=400,
-                    mimetype='text/plain'
-                )
-                return response
-
-            # Check if it's reCAPTCHA v3
-            if version == 'v3':
-                captcha_type = 'recaptcha3'
-                captcha_data = {
-                    'googlekey': googlekey,
-                    'pageurl': pageurl,
-                    'action': action,
-                    'min_score': min_score,
-                    'enterprise': enterprise,
-                    'userAgent': user_agent
-                }
-            else:
-                # Regular reCAPTCHA v2
-                captcha_type = 'recaptcha'
-                captcha_data = {
-                    'googlekey': googlekey,
-                    'pageurl': pageurl,
-                    'invisible': invisible,
-                    'enterprise': enterprise,
-                    'userAgent': user_agent
-                }
-        elif method == 'hcaptcha':
-            if not sitekey or not pageurl:
-                response = app.response_class(
-                    response="ERROR_CAPTCHA_UNSOLVABLE",
-                    status=400,
-                    mimetype='text/plain'
-                )
-                return response
-            # Store additional parameters for hCaptcha
-            captcha_type = 'hcaptcha'
+    Args:
+        captcha_id: Key of the 'solving' entry in captcha_results
+        kind: Captcha type, a key of _SOLVER_DISPATCH
+        job_key: Tuple identifying the captcha, see submit_solve_job
+        pageurl: Page hosting the captcha
+        **params: Remaining submission fields (sitekey, action, ...)
+    """
+    # Remembered so a bad report can evict the token from token_cache
+    with captcha_results_lock:
+        entry = captcha_results.get(captcha_id)
+        if entry is not None:
+            entry['job_key'] = job_key
+
+    logger.info("Started solving %s captcha %s for %s",
+                kind, captcha_id, pageurl)
+
+    def solve_in_background():
+        return _solve_with_browser(kind, pageurl, **params)
+
+    def record_result(future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error("Error in background solving for captcha %s: %s",
+                         captcha_id, e)
+            result = None
+
+        status = 'ready' if result else 'failed'
+        # Update in place; 'timestamp' keeps the submission time. A
+        # missing entry was reported or expired and stays gone.
+        with captcha_results_lock:
+            entry = captcha_results.get(captcha_id)
+            if entry is not None:
+                entry['status'] = status
+                entry['result'] = result
+        logger.info("Captcha %s solving completed with status: %s",
+                    captcha_id, status)
+
+    submit_solve_job(job_key, solve_in_background).add_done_callback(
+        record_result)
+
+
+def _drop_result(captcha_id: str, bad: bool) -> None:
+    """Forget a reported captcha; a bad token is also evicted from token_cache.
+
+    Args:
+        captcha_id: ID returned at submission
+        bad: Whether the client reported the token as rejected
+    """
+    with captcha_results_lock:
+        entry = captcha_results.pop(captcha_id, None)
+    if not bad or entry is None or 'job_key' not in entry:
+        return
+    with token_cache_lock:
+        # Leave a newer token for the same job alone
+        if token_cache.get(entry['job_key']) == entry['result']:
+            del token_cache[entry['job_key']]
+
+
+def _submit_form(form) -> Tuple[bytes, int]:
+    """Validate one 2captcha submission and queue it for solving.
+
+    Args:
+        form: Mapping of the /in.php form fields
+
+    Returns:
+        (2captcha reply body, HTTP status)
+    """
+    api_key = form.get('key')
+    if not api_key or not validate_api_key(api_key):
+        return RESP_BAD_KEY, 401
+
+    # Branch on method first so each arm only reads the fields it uses
+    method = form.get('method')
+
+    # Support multiple captcha types as per 2captcha .ini
+    if method == 'userrecaptcha':
+        googlekey = form.get('googlekey')
+        pageurl = form.get('pageurl')
+        if not googlekey or not pageurl:
+            return RESP_UNSOLVABLE, 400
+
+        # Check if it's reCAPTCHA v3
+        if form.get('version', '') == 'v3':
+            captcha_type = 'recaptcha3'
             captcha_data = {
-                'sitekey': sitekey,
+                'googlekey': googlekey,
                 'pageurl': pageurl,
-                'data': data,
-                'userAgent': user_agent
+                'action': form.get('action', ''),
+                'min_score': form.get('min_score', ''),
+                'enterprise': form.get('enterprise', '0'),
+                'userAgent': form.get('userAgent', '')
             }
-        elif method == 'post':  # Image captcha
-            # Handle image captcha (would need file upload)
-            response = app.response_class(
-                response="ERROR_CAPTCHA_UNSOLVABLE",
-                status=400,
-                mimetype='text/plain'
-            )
-            return response
-        elif text_captcha:
-            # Handle text captcha
-            response = app.response_class(
-                response="ERROR_CAPTCHA_UNSOLVABLE",
-                status=400,
-                mimetype='text/plain'
-            )
-            return response
         else:
-            response = app.response_class(
-                response="ERROR_CAPTCHA_UNSOLVABLE",
-                status=400,
-                mimetype='text/plain'
-            )
-            return response
+            # Regular reCAPTCHA v2
+            captcha_type = 'recaptcha'
+            captcha_data = {
+                'googlekey': googlekey,
+                'pageurl': pageurl,
+                'invisible': form.get('invisible', '0'),
+                'enterprise': form.get('enterprise', '0'),
+                'userAgent': form.get('userAgent', '')
+            }
+    elif method == 'hcaptcha':
+        sitekey = form.get('sitekey', '')
+        pageurl = form.get('pageurl')
+        if not sitekey or not pageurl:
+            return RESP_UNSOLVABLE, 400
+        # Store additional parameters for hCaptcha
+        captcha_type = 'hcaptcha'
+        captcha_data = {
+            'sitekey': sitekey,
+            'pageurl': pageurl,
+            'data': form.get('data', ''),
+            'userAgent': form.get('userAgent', '')
+        }
+    else:
+        # Image (method=post), text and unknown captchas are unsupported
+        return RESP_UNSOLVABLE, 400
 
-        # Generate captcha ID
-        captcha_id = str(int(time.time()))
+    # Generate captcha ID
+    captcha_id = str(next(_id_counter))
 
-        # Initialize the captcha result entry
+    # Initialize the captcha result entry
+    with captcha_results_lock:
         captcha_results[captcha_id] = {
             'status': 'solving',
             'result': None,
@@ -443,63 +615,49 @@ def submit_captcha():
             'data': captcha_data
         }
 
-        logger.info(
-            f"Started solving {captcha_type} captcha {captcha_id} for {pageurl}")
+    job_key = (captcha_type, pageurl,
+               captcha_data.get('googlekey') or captcha_data.get('sitekey'),
+               captcha_data.get('action', ''))
+    _start_solve(captcha_id, captcha_type, job_key, **captcha_data)
 
-        # Start solving in background thread
-        def solve_in_background():
-            try:
-                if captcha_type == 'recaptcha':
-                    result = solve_captcha_with_browser(
-                        pageurl, captcha_data['googlekey'])
-                elif captcha_type == 'recaptcha3':
-                    result = solve_recaptcha3_with_browser(
-                        pageurl, captcha_data['googlekey'],
-                        captcha_data.get('action', ''), captcha_data.get('min_score', '0.3'))
-                elif captcha_type == 'hcaptcha':
-                    result = solve_hcaptcha_with_browser(
-                        pageurl, captcha_data['sitekey'], captcha_data.get('data', ''))
-                else:
-                    result = None
-
-                captcha_results[captcha_id] = {
-                    'status': 'ready' if result else 'failed',
-                    'result': result,
-                    'timestamp': time.time(),
-                    'type': captcha_type,
-                    'data': captcha_data
-                }
-                logger.info(
-                    f"Captcha {captcha_id} solving completed with status: {captcha_results[captcha_id]['status']}")
-            except Exception as e:
-                logger.error(
-                    f"Error in background solving for captcha {captcha_id}: {e}")
-                captcha_results[captcha_id] = {
-                    'status': 'failed',
-                    'result': None,
-                    'timestamp': time.time(),
-                    'type': captcha_type,
-                    'data': captcha_data
-                }
-
-        threading.Thread(target=solve_in_background, daemon=True).start()
-
-        # Return captcha ID immediately in 2captcha format: "OK|%report_id%"
-        response = app.response_class(
-            response=f"OK|{captcha_id}",
-            status=200,
-            mimetype='text/plain'
-        )
-        return response
+    # Return captcha ID immediately in 2captcha format: "OK|%report_id%"
+    return b"OK|" + captcha_id.encode('ascii'), 200
+
+
+@app.route('/in.php', methods=['POST'])
+def submit_captcha():
+    """Submit captcha for solving - mimics 2captcha API."""
+    try:
+        body, status = _submit_form(request.form)
+        return text_response(body, status)
 
     except Exception as e:
-        logger.error(f"Error submitting captcha: {e}")
-        response = app.response_class(
-            response="ERROR_CAPTCHA_UNSOLVABLE",
-            status=500,
-            mimetype='text/plain'
-        )
-        return response
+        logger.error("Error submitting captcha: %s", e)
+        return text_response(RESP_UNSOLVABLE, 500)
+
+
+@app.route('/in.php/batch', methods=['POST'])
+def submit_captcha_batch():
+    """Submit several captchas in one request.
+
+    Takes a JSON array of /in.php form objects and returns a JSON array
+    with each item's 2captcha reply ("OK|<id>" or an ERROR_ code), in order.
+    """
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty JSON array'}), 400
+    if len(items) > MAX_BATCH_SUBMIT:
+        return jsonify({'error': f'At most {MAX_BATCH_SUBMIT} captchas per batch'}), 400
+
+    replies = []
+    for item in items:
+        try:
+            body, _ = _submit_form(item if isinstance(item, dict) else {})
+        except Exception as e:
+            logger.error("Error submitting captcha in batch: %s", e)
+            body = RESP_UNSOLVABLE
+        replies.append(body.decode('ascii'))
+    return jsonify(replies)
 
 
 @app.route('/res.php', methods=['GET'])
@@ -512,95 +670,47 @@ def get_captcha_result():
         captcha_id = request.args.get('id')
 
         if not api_key or not validate_api_key(api_key):
-            response = app.response_class(
-                response="ERROR_KEY_DOES_NOT_EXIST",
-                status=401,
-                mimetype='text/plain'
-            )
-            return response
+            return text_response(RESP_BAD_KEY, 401)
 
         if action == 'get':
-            if captcha_id not in captcha_results:
-                logger.warning(
-                    f"Captcha ID {captcha_id} not found in results. Available IDs: {list(captcha_results.keys())}")
-                response = app.response_class(
-                    response="ERROR_WRONG_ID_FORMAT",
-                    status=400,
-                    mimetype='text/plain'
-                )
-                return response
-
-            result_data = captcha_results[captcha_id]
+            with captcha_results_lock:
+                result_data = captcha_results.get(captcha_id)
+
+            if result_data is None:
+                logger.warning("Captcha ID %s not found in results",
+                               captcha_id)
+                return text_response(RESP_WRONG_ID, 400)
 
             if result_data['status'] == 'ready':
                 # Return the result in 2captcha format: "OK|%result%"
-                response = app.response_class(
-                    response=f"OK|{result_data['result']}",
-                    status=200,
-                    mimetype='text/plain'
-                )
-                return response
+                return text_response(
+                    b"OK|" + str(result_data['result']).encode())
             elif result_data['status'] == 'failed':
-                response = app.response_class(
-                    response="ERROR_CAPTCHA_UNSOLVABLE",
-                    status=400,
-                    mimetype='text/plain'
-                )
-                return response
+                return text_response(RESP_UNSOLVABLE, 400)
             else:
                 # Still solving
-                response = app.response_class(
-                    response="CAPCHA_NOT_READY",
-                    status=200,
-                    mimetype='text/plain'
-                )
-                return response
+                return text_response(RESP_NOT_READY, 200, headers=NO_STORE)
 
         elif action == 'getbalance':
             # Return balance in 2captcha format (plain text)
-            response = app.response_class(
-                response="999.99",
-                status=200,
-                mimetype='text/plain'
-            )
-            return response
+            return text_response(RESP_BALANCE, 200)
         elif action == 'reportbad':
             # Report bad captcha
-            if captcha_id and captcha_id in captcha_results:
-                del captcha_results[captcha_id]
-            response = app.response_class(
-                response="OK_REPORT_RECORDED",
-                status=200,
-                mimetype='text/plain'
-            )
-            return response
+            if captcha_id:
+                _drop_result(captcha_id, bad=True)
+            return text_response(RESP_REPORT_RECORDED, 200)
         elif action == 'reportgood':
             # Report good captcha
-            if captcha_id and captcha_id in captcha_results:
-                del captcha_results[captcha_id]
-            response = app.response_class(
-                response="OK_REPORT_RECORDED",
-                status=200,
-                mimetype='text/plain'
-            )
-            return response
+            if captcha_id:
+                _drop_result(captcha_id, bad=False)
+            return text_response(RESP_REPORT_RECORDED, 200)
 
         else:
-            response = app.response_class(
-                response="ERROR_WRONG_ID_FORMAT",
-                status=400,
-                mimetype='text/plain'
-            )
-            return response
+            return text_response(RESP_WRONG_ID, 400)
 
     except Exception as e:
-        logger.error(f"Error getting captcha result: {e}")
-        response = app.response_class(
-            response="ERROR_CAPTCHA_UNSOLVABLE",
-            status=500,
-            mimetype='text/plain'
-        )
-        return response
+        logger.error("Error getting captcha result: %s", e)
+        return text_response(RESP_UNSOLVABLE, 500)
 
 
 @app.route('/captcha', methods=['POST'])
@@ -625,39 +735,18 @@ def solve_captcha_modern():
             return jsonify({'error': 'Missing googlekey or pageurl'}), 400
 
         # Generate captcha ID
-        captcha_id = str(int(time.time()))
+        captcha_id = str(next(_id_counter))
 
         # Initialize the captcha result entry
-        captcha_results[captcha_id] = {
-            'status': 'solving',
-            'result': None,
-            'timestamp': time.time()
-        }
-
-        logger.info(
-            f"Started solving captcha {captcha_id} for {pageurl} (modern API)")
-
-        # Start solving in background thread
-        def solve_in_background():
-            try:
-                result = solve_captcha_with_browser(pageurl, googlekey)
-                captcha_results[captcha_id] = {
-                    'status': 'ready' if result else 'failed',
-                    'result': result,
-                    'timestamp': time.time()
-                }
-                logger.info(
-                    f"Captcha {captcha_id} solving completed with status: {captcha_results[captcha_id]['status']}")
-            except Exception as e:
-                logger.error(
-                    f"Error in background solving for captcha {captcha_id}: {e}")
-                captcha_results[captcha_id] = {
-                    'status': 'failed',
-                    'result': None,
-                    'timestamp': time.time()
-                }
+        with captcha_results_lock:
+            captcha_results[captcha_id] = {
+                'status': 'solving',
+                'result': None,
+                'timestamp': time.time()
+            }
 
-        threading.Thread(target=solve_in_background, daemon=True).start()
+        _start_solve(captcha_id, 'recaptcha', ('recaptcha', pageurl, googlekey, ''),
+                     pageurl, googlekey=googlekey)
 
         # Return captcha ID immediately
         return jsonify({
@@ -667,7 +756,7 @@ def solve_captcha_modern():
         })
 
     except Exception as e:
-        logger.error(f"Error solving captcha: {e}")
+        logger.error("Error solving captcha: %s", e)
         return jsonify({
             'error': str(e),
             'is_correct': False
@@ -678,17 +767,18 @@ def solve_captcha_modern():
 def get_captcha_result_modern(captcha_id):
     """Get captcha result by ID."""
     try:
-        if captcha_id not in captcha_results:
-            logger.warning(
-                f"Modern API: Captcha ID {captcha_id} not found in results. Available IDs: {list(captcha_results.keys())}")
+        with captcha_results_lock:
+            result_data = captcha_results.get(captcha_id)
+
+        if result_data is None:
+            logger.warning("Modern API: Captcha ID %s not found in results",
+                           captcha_id)
             return jsonify({
                 'captcha': captcha_id,
                 'error': 'Captcha not found',
                 'is_correct': False
             }), 404
 
-        result_data = captcha_results[captcha_id]
-
         if result_data['status'] == 'ready':
             return jsonify({
                 'captcha': captcha_id,
@@ -709,7 +799,7 @@ def get_captcha_result_modern(captcha_id):
             }), 202
 
     except Exception as e:
-        logger.error(f"Error getting captcha result: {e}")
+        logger.error("Error getting captcha result: %s", e)
         return jsonify({
             'error': str(e),
             'is_correct': False
@@ -724,13 +814,12 @@ def report_captcha(captcha_id):
         is_correct = data.get('is_correct', False)
 
         # Clean up the result
-        if captcha_id in captcha_results:
-            del captcha_results[captcha_id]
+        _drop_result(captcha_id, bad=not is_correct)
 
         return jsonify({'status': 'reported'})
 
     except Exception as e:
-        logger.error(f"Error reporting captcha: {e}")
+        logger.error("Error reporting captcha: %s", e)
         return jsonify({'error': str(e)}), 500
 
 
@@ -742,48 +831,70 @@ def root():
 
 @app.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint.
+
+    With ``?full=1`` the response also carries the balance, the /status
+    payload and Chrome's /json/version, so a client can run every health
+    check in one round trip.
+    """
+    full = request.args.get('full') == '1'
+
     # Check Chrome connectivity
     chrome_status = "unknown"
+    chrome_version = None
     try:
-        import urllib.request
-        response = urllib.request.urlopen(
-            'http://127.0.0.1:9222/json/version', timeout=2)
-        if response.getcode() == 200:
+        response = _chrome_probe_session.get(CHROME_VERSION_URL, timeout=2)
+        if response.status_code == 200:
             chrome_status = "connected"
+            if full:
+                chrome_version = response.json()
         else:
             chrome_status = "error"
-    except Exception as e:
+    except (requests.RequestException, ValueError) as e:
         chrome_status = f"disconnected: {str(e)}"
 
     # Get proxy statistics
     proxy_stats = get_proxy_stats()
 
-    return jsonify({
+    health = {
         'status': 'healthy',
         'service': 'Fake 2captcha API reCAPTCHA Solver',
         'version': '1.0.0',
-        'api_key_configured': bool(API_KEY != 'your_fake_api_key_here'),
+        'api_key_configured': API_KEY_CONFIGURED,
         'chrome_status': chrome_status,
         'chrome_debug_port': 9222,
         'proxy_stats': proxy_stats
+    }
+    if not full:
+        return jsonify(health)
+
+    return jsonify({
+        'health': health,
+        'balance': RESP_BALANCE.decode(),
+        'status': _status_payload(),
+        'chrome': chrome_version
     })
 
 
-@app.route('/status', methods=['GET'])
-def get_status():
-    """Get service status."""
+def _status_payload() -> Dict[str, Any]:
+    """Build the /status body."""
     # The active_browsers count is no longer relevant with the shared browser
     # but we can still report the number of captchas being solved.
-    with browser_lock:
-        active_count = len(captcha_results)
+    # len() is atomic; browser_lock guards the browser, not the results.
+    active_count = len(captcha_results)
 
-    return jsonify({
+    return {
         'service_status': 'running',
         'api_provider': 'fake_2captcha',
         'active_browsers': active_count,
-        'pending_captchas': len(captcha_results)
-    })
+        'pending_captchas': active_count
+    }
+
+
+@app.route('/status', methods=['GET'])
+def get_status():
+    """Get service status."""
+    return jsonify(_status_payload())
 
 
 @app.route('/config', methods=['GET'])
@@ -791,7 +902,7 @@ def get_config():
     """Get current configuration (without sensitive data)."""
     return jsonify({
         'api_provider': 'fake_2captcha',
-        'api_key_configured': bool(API_KEY != 'your_fake_api_key_here'),
+        'api_key_configured': API_KEY_CONFIGURED,
         'port': PORT
     })
 
@@ -834,9 +945,9 @@ if __name__ == '__main__':
     os.environ['PYTHONUNBUFFERED'] = '1'
 
     logger.info("Starting Fake 2captcha API reCAPTCHA Solver...")
-    logger.info(
-        f"API Key configured: {bool(API_KEY != 'your_fake_api_key_here')}")
-    logger.info(f"Service port: {PORT}")
+    logger.info("API Key configured: %s",
+                API_KEY_CONFIGURED)
+    logger.info("Service port: %s", PORT)
 
     logger.info("Available endpoints:")
     logger.info("  GET /user - Get balance")
@@ -851,4 +962,11 @@ if __name__ == '__main__':
     logger.info("  GET /proxies - Proxy information")
     logger.info("  POST /proxies/refresh - Refresh proxy list")
 
-    app.run(host='0.0.0.0', port=PORT, debug=False, threaded=True)
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning(
+            "waitress not installed, falling back to Flask development server")
+        app.run(host='0.0.0.0', port=PORT, debug=False, threaded=True)
+    else:
+        serve(app, host='0.0.0.0', port=PORT, threads=WSGI_THREADS)
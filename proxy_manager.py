@@ -5,94 +5,488 @@ Fetches and rotates proxies from TheSpeedX's proxy list
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import random
 import time
 import threading
+import queue
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import os
-from typing import List, Optional, Dict
+import atexit
+import bisect
+import functools
+import itertools
+import re
+import sqlite3
+from typing import List, Optional, Dict, Set, Tuple
 from datetime import datetime, timedelta
 import logging
+from collections import OrderedDict
+
+try:
+    import asyncio
+    import aiohttp  # Optional: tests proxies on one event loop
+except ImportError:
+    aiohttp = None
+
+try:
+    import orjson  # Optional faster JSON for the legacy proxy file
+except ImportError:
+    orjson = None
 
 logger = logging.getLogger(__name__)
 
+PROXY_TEST_URL = 'http://httpbin.org/ip'
+
+# A proxy list line we accept: ip:port, nothing else
+_IP_RE = re.compile(rb'^\d{1,3}(?:\.\d{1,3}){3}:\d{1,5}$')
+
+
+def _monotonic_to_iso(t: Optional[float]) -> Optional[str]:
+    """Convert a time.monotonic() reading to a wall-clock ISO string."""
+    if t is None:
+        return None
+    return datetime.fromtimestamp(time.time() - (time.monotonic() - t)).isoformat()
+
+
+def _iso_to_monotonic(value: Optional[str]) -> Optional[float]:
+    """Convert a wall-clock ISO string to a time.monotonic() reading."""
+    if not value:
+        return None
+    return time.monotonic() - (time.time() - datetime.fromisoformat(value).timestamp())
+
+
+@functools.lru_cache(maxsize=1024)
+def _proxy_dict(proxy: str) -> Dict[str, str]:
+    """Build the requests proxy mapping for an address (shared; don't mutate)."""
+    return {
+        'http': f'http://{proxy}',
+        'https': f'http://{proxy}'
+    }
+
 
 class ProxyManager:
     """Manages proxy rotation for anti-detection."""
 
+    FLUSH_INTERVAL = 5.0  # Seconds between background saves of dirty state
+    SAMPLE_ATTEMPTS = 8  # Weighted draws tried before taking the LRU head
+    REST_PERIOD = 300.0  # Seconds between reuses before a proxy counts as rested
+    LATENCY_EWMA_ALPHA = 0.1
+    REVALIDATE_AFTER = 900  # Seconds before a loaded proxy is re-tested
+    MARK_BATCH = 64  # Queued marks applied per lock acquisition
+    WEIGHT_REBUILD_MARKS = 16  # Applied marks before weights are rebuilt
+    _UPSERT_SQL = (
+        "INSERT OR REPLACE INTO proxies (proxy, last_used, success_count, "
+        "fail_count, last_verified, last_latency) VALUES (?, ?, ?, ?, ?, ?)")
+
     def __init__(self):
         self.proxy_list_urls = [
             "https://raw.githubusercontent.com/TheSpeedX/PROXY-List/master/http.txt",
             "https://cdn.jsdelivr.net/gh/proxifly/free-proxy-list@main/proxies/protocols/http/data.txt"
         ]
         self.proxies: List[str] = []
-        self.working_proxies: List[Dict] = []
+        # Working proxies by address (mutated under self.lock), ordered
+        # least recently used first, plus an immutable snapshot of the
+        # entries that readers use without locking. Entry 'last_used' is a
+        # time.monotonic() reading (or None); storage holds ISO wall time.
+        self._by_addr: "OrderedDict[str, Dict]" = OrderedDict()
+        self._snapshot: Tuple[Dict, ...] = ()
+        # Running sums of the stored entries' counts, kept under self.lock
+        self._total_success = 0
+        self._total_fail = 0
+        # Success/failure marks are queued as (proxy, ok, latency) and
+        # applied in batches by a background thread under self.lock
+        self._marks: "queue.SimpleQueue[Tuple[str, bool, Optional[float]]]" = \
+            queue.SimpleQueue()
+        self._applier: Optional[threading.Thread] = None
         self.last_fetch: Optional[datetime] = None
         self.fetch_interval = timedelta(hours=1)  # Refresh every hour
         self.lock = threading.Lock()
         self.test_timeout = 10
+        # One pooled requests.Session per thread (Sessions aren't thread-safe)
+        self._session = threading.local()
+        self.async_concurrency = 200  # In-flight checks when using aiohttp
+        # Running average of reported proxy latencies (seconds)
+        self._latency_avg: Optional[float] = None
+        # Cumulative selection weights over _cum_entries (a snapshot),
+        # rebuilt by get_proxy after membership changes or once
+        # WEIGHT_REBUILD_MARKS count updates have accumulated
+        self._cum_entries: Tuple[Dict, ...] = ()
+        self._cum_weights: List[float] = []
+        self._weights_stale = True
+        self._marks_since_rebuild = 0
+        self.db_file = "working_proxies.db"
+        # Legacy JSON store, imported into db_file if the database is missing
         self.proxy_file = "working_proxies.json"
         self.max_failures = 3
         self.min_proxies = 5  # Minimum proxies before we need to refresh
 
+        # Debounced persistence: changes record the touched addresses and
+        # set _dirty; a background thread writes just those rows
+        self._dirty = threading.Event()
+        self._dirty_lock = threading.Lock()
+        self._dirty_addrs: Set[str] = set()
+        self._removed_addrs: Set[str] = set()
+        self._full_save = False
+        self._save_lock = threading.Lock()  # Serialises use of _db
+        self._db: Optional[sqlite3.Connection] = None
+        self._flusher_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._revalidation_started = False
+
         # Load existing working proxies
         self.load_working_proxies()
 
     def load_working_proxies(self) -> None:
         """Load working proxies from persistent storage."""
         try:
-            if os.path.exists(self.proxy_file):
-                with open(self.proxy_file, 'r') as f:
-                    data = json.load(f)
-                    self.working_proxies = data.get('proxies', [])
-                    last_refresh = data.get('last_refresh')
-                    if last_refresh:
-                        self.last_fetch = datetime.fromisoformat(last_refresh)
-                    logger.info(
-                        f"Loaded {len(self.working_proxies)} working proxies from storage")
+            if os.path.exists(self.db_file):
+                with self._save_lock:
+                    db = self._get_db()
+                    rows = db.execute(
+                        "SELECT proxy, last_used, success_count, fail_count, "
+                        "last_verified, last_latency FROM proxies").fetchall()
+                    meta = db.execute(
+                        "SELECT value FROM meta WHERE key = 'last_refresh'").fetchone()
+                self.working_proxies = [self._from_row(row) for row in rows]
+                last_refresh = meta[0] if meta else None
+            elif os.path.exists(self.proxy_file):
+                # One-off migration from the JSON file
+                with open(self.proxy_file, 'rb') as f:
+                    raw = f.read()
+                data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+                self.working_proxies = [
+                    self._deserialize_entry(p) for p in data.get('proxies', [])]
+                last_refresh = data.get('last_refresh')
+                logger.info(
+                    f"Migrating {len(self.working_proxies)} proxies from {self.proxy_file} to {self.db_file}")
+                self._mark_all_dirty()
             else:
                 logger.info(
                     "No existing proxy file found, will fetch fresh proxies")
+                return
+
+            if last_refresh:
+                self.last_fetch = datetime.fromisoformat(last_refresh)
+            logger.info(
+                f"Loaded {len(self.working_proxies)} working proxies from storage")
         except Exception as e:
             logger.error(f"Failed to load working proxies: {e}")
             self.working_proxies = []
 
+    def _get_db(self) -> sqlite3.Connection:
+        """Open the proxy database on first use (caller holds _save_lock)."""
+        if self._db is None:
+            db = sqlite3.connect(self.db_file, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS proxies ("
+                "proxy TEXT PRIMARY KEY, last_used TEXT, "
+                "success_count INTEGER NOT NULL DEFAULT 0, "
+                "fail_count INTEGER NOT NULL DEFAULT 0, "
+                "last_verified REAL, last_latency REAL)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    @staticmethod
+    def _to_row(proxy_data: Dict) -> Tuple:
+        """Convert an entry to a proxies table row."""
+        return (
+            proxy_data['proxy'],
+            _monotonic_to_iso(proxy_data['last_used']),
+            proxy_data['success_count'],
+            proxy_data['fail_count'],
+            proxy_data.get('last_verified'),
+            proxy_data.get('last_latency'),
+        )
+
+    @staticmethod
+    def _from_row(row: Tuple) -> Dict:
+        """Convert a proxies table row to an entry."""
+        proxy, last_used, success_count, fail_count, last_verified, last_latency = row
+        proxy_data = {
+            'proxy': proxy,
+            'last_used': _iso_to_monotonic(last_used),
+            'success_count': success_count,
+            'fail_count': fail_count,
+        }
+        if last_verified is not None:
+            proxy_data['last_verified'] = last_verified
+        if last_latency is not None:
+            proxy_data['last_latency'] = last_latency
+        return proxy_data
+
+    @staticmethod
+    def _deserialize_entry(entry: Dict) -> Dict:
+        """Convert a legacy JSON entry (ISO last_used) to a fresh dict."""
+        proxy_data = dict(entry)
+        proxy_data['last_used'] = _iso_to_monotonic(proxy_data.get('last_used'))
+        return proxy_data
+
+    @property
+    def working_proxies(self) -> Tuple[Dict, ...]:
+        """Current working proxy entries (read-only snapshot, lock-free)."""
+        return self._snapshot
+
+    @working_proxies.setter
+    def working_proxies(self, proxies: List[Dict]) -> None:
+        ordered = sorted(proxies, key=lambda p: (
+            p['last_used'] if p['last_used'] is not None else float('-inf')))
+        with self.lock:
+            self._by_addr = OrderedDict((p['proxy'], p) for p in ordered)
+            self._total_success = sum(p['success_count'] for p in ordered)
+            self._total_fail = sum(p['fail_count'] for p in ordered)
+            self._publish()
+
+    def _publish(self) -> None:
+        """Publish a new snapshot after membership changes (caller holds lock).
+
+        Entries are shared with the store, so count and last-used updates
+        show up without republishing; only adds and removals need this.
+        """
+        self._snapshot = tuple(self._by_addr.values())
+        self._weights_stale = True
+
+    def _add_proxy(self, proxy_data: Dict) -> bool:
+        """Add a proxy unless its address is known (caller holds lock).
+
+        The caller publishes once after a batch of adds.
+        """
+        addr = proxy_data['proxy']
+        if addr in self._by_addr:
+            return False
+        self._by_addr[addr] = proxy_data
+        self._total_success += proxy_data['success_count']
+        self._total_fail += proxy_data['fail_count']
+        if proxy_data['last_used'] is None:
+            # Never used: goes to the head of the LRU order
+            self._by_addr.move_to_end(addr, last=False)
+        return True
+
+    def _remove_proxy(self, proxy_data: Dict, publish: bool = True) -> None:
+        """Drop a proxy and publish the new snapshot (caller holds lock).
+
+        Pass publish=False when removing a batch and publish once after.
+        """
+        addr = proxy_data['proxy']
+        del self._by_addr[addr]
+        self._mark_removed(addr)
+        self._total_success -= proxy_data['success_count']
+        self._total_fail -= proxy_data['fail_count']
+        if publish:
+            self._publish()
+
+    def add_working_proxy(self, proxy_data: Dict) -> bool:
+        """Add a tested proxy to the working set.
+
+        Args:
+            proxy_data: Proxy entry as returned by test_proxies_batch
+
+        Returns:
+            True if added, False if the address was already present
+        """
+        with self.lock:
+            added = self._add_proxy(proxy_data)
+            if added:
+                self._publish()
+            return added
+
+    def add_working_proxies(self, proxies: List[Dict]) -> int:
+        """Add tested proxies, skipping addresses already present.
+
+        Duplicates within the batch are skipped too, since each add updates
+        the index before the next is checked. Publishes one snapshot.
+
+        Args:
+            proxies: Proxy entries as returned by test_proxies_batch
+
+        Returns:
+            Number of proxies added
+        """
+        with self.lock:
+            added = sum(1 for proxy_data in proxies if self._add_proxy(proxy_data))
+            if added:
+                self._publish()
+        return added
+
+    def _write_meta(self, db: sqlite3.Connection) -> None:
+        """Store last_refresh (caller holds _save_lock, inside a transaction)."""
+        db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_refresh', ?)",
+            (self.last_fetch.isoformat() if self.last_fetch else None,))
+
     def save_working_proxies(self) -> None:
-        """Save working proxies to persistent storage."""
+        """Save all working proxies to persistent storage.
+
+        Rewrites the proxies table in one transaction. Runs synchronously;
+        the service itself calls _mark_dirty() and lets the background
+        flusher write only the changed rows.
+        """
         try:
-            data = {
-                'proxies': self.working_proxies,
-                'last_refresh': self.last_fetch.isoformat() if self.last_fetch else None
-            }
-            with open(self.proxy_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            rows = [self._to_row(p) for p in self.working_proxies]
+            with self._save_lock:
+                db = self._get_db()
+                with db:
+                    db.execute("DELETE FROM proxies")
+                    db.executemany(self._UPSERT_SQL, rows)
+                    self._write_meta(db)
+            logger.debug(f"Saved {len(rows)} working proxies to storage")
+        except Exception as e:
+            logger.error(f"Failed to save working proxies: {e}")
+
+    def remove_failed_proxies(self, max_failures: int) -> int:
+        """Drop proxies with more than max_failures failures.
+
+        Scans the snapshot first and leaves the store untouched when
+        nothing qualifies; otherwise removes just the offenders and
+        publishes once.
+
+        Args:
+            max_failures: Highest failure count a proxy may keep
+
+        Returns:
+            Number of proxies removed
+        """
+        violators = [p for p in self._snapshot
+                     if p.get('fail_count', 0) > max_failures]
+        if not violators:
+            return 0
+        removed = 0
+        with self.lock:
+            for p in violators:
+                if self._by_addr.get(p['proxy']) is p:
+                    self._remove_proxy(p, publish=False)
+                    removed += 1
+            if removed:
+                self._publish()
+        return removed
+
+    def _mark_dirty(self, *addrs: str) -> None:
+        """Schedule a background save of the given proxies and metadata.
+
+        With no addresses only the metadata (last_refresh) is rewritten.
+        """
+        if addrs:
+            with self._dirty_lock:
+                self._dirty_addrs.update(addrs)
+        self._dirty.set()
+        self._ensure_flusher()
+
+    def _mark_all_dirty(self) -> None:
+        """Schedule a background rewrite of the whole proxies table."""
+        with self._dirty_lock:
+            self._full_save = True
+        self._dirty.set()
+        self._ensure_flusher()
+
+    def _mark_removed(self, addr: str) -> None:
+        """Schedule a background delete of a removed proxy."""
+        with self._dirty_lock:
+            self._dirty_addrs.discard(addr)
+            self._removed_addrs.add(addr)
+        self._dirty.set()
+        self._ensure_flusher()
+
+    def _ensure_flusher(self) -> None:
+        """Start the background flusher thread on first use."""
+        if self._flusher is None:
+            with self._flusher_lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop, name="proxy-flusher", daemon=True)
+                    self._flusher.start()
+                    atexit.register(self.flush)
+
+    def _flush_loop(self) -> None:
+        """Save pending changes at most once per FLUSH_INTERVAL."""
+        while True:
+            time.sleep(self.FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending changes now, touching only the affected rows."""
+        self._apply_pending()
+        if not self._dirty.is_set():
+            return
+        self._dirty.clear()
+        with self._dirty_lock:
+            full_save, self._full_save = self._full_save, False
+            dirty, self._dirty_addrs = self._dirty_addrs, set()
+            removed, self._removed_addrs = self._removed_addrs, set()
+
+        if full_save:
+            self.save_working_proxies()
+            return
+
+        try:
+            rows = []
+            for addr in dirty:
+                proxy_data = self._by_addr.get(addr)
+                if proxy_data is not None:
+                    rows.append(self._to_row(proxy_data))
+            with self._save_lock:
+                db = self._get_db()
+                with db:
+                    db.executemany(self._UPSERT_SQL, rows)
+                    db.executemany("DELETE FROM proxies WHERE proxy = ?",
+                                   [(addr,) for addr in removed])
+                    self._write_meta(db)
             logger.debug(
-                f"Saved {len(self.working_proxies)} working proxies to storage")
+                f"Flushed {len(rows)} updated and {len(removed)} removed proxies")
         except Exception as e:
             logger.error(f"Failed to save working proxies: {e}")
 
+    def _session_for_thread(self) -> requests.Session:
+        """Get this thread's pooled session, creating it on first use."""
+        session = getattr(self._session, 's', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=50, pool_maxsize=50, max_retries=0)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session.s = session
+        return session
+
+    def _fetch_source(self, url: str) -> Set[str]:
+        """Download and parse one proxy list source."""
+        source_name = url.split(
+            '/')[-2] if 'github.com' in url else url.split('/')[-3]
+        logger.info(f"Fetching proxy list from {source_name}...")
+        proxies = set()
+        # Stream the body and parse line by line (one proxy per line),
+        # staying in bytes and decoding only well-formed ip:port lines so
+        # junk never takes a test slot
+        with self._session_for_thread().get(url, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                line = line.strip()
+                if _IP_RE.match(line):
+                    proxies.add(line.decode('ascii'))
+        logger.info(
+            f"Fetched {len(proxies)} proxies from {source_name}")
+        return proxies
+
     def fetch_proxy_list(self) -> List[str]:
-        """Fetch fresh proxy list from multiple sources."""
+        """Fetch fresh proxy list from multiple sources concurrently."""
         all_proxies = set()  # Use set to avoid duplicates
 
-        for url in self.proxy_list_urls:
-            try:
-                source_name = url.split(
-                    '/')[-2] if 'github.com' in url else url.split('/')[-3]
-                logger.info(f"Fetching proxy list from {source_name}...")
-                response = requests.get(url, timeout=30)
-                response.raise_for_status()
-
-                # Parse proxy list (one proxy per line)
-                proxy_list = [proxy.strip()
-                              for proxy in response.text.split('\n') if proxy.strip()]
-                all_proxies.update(proxy_list)
-                logger.info(
-                    f"Fetched {len(proxy_list)} proxies from {source_name}")
-
-            except Exception as e:
-                logger.error(f"Failed to fetch proxy list from {url}: {e}")
-                continue
+        # Sources download in parallel, so total time is the slowest source
+        # rather than the sum; results are merged on this thread
+        with ThreadPoolExecutor(max_workers=len(self.proxy_list_urls) or 1) as executor:
+            futures = {executor.submit(self._fetch_source, url): url
+                       for url in self.proxy_list_urls}
+            for future in as_completed(futures):
+                try:
+                    all_proxies.update(future.result())
+                except Exception as e:
+                    logger.error(
+                        f"Failed to fetch proxy list from {futures[future]}: {e}")
 
         # Convert set back to list
         final_proxy_list = list(all_proxies)
@@ -109,8 +503,8 @@ class ProxyManager:
             }
 
             # Test with a simple request
-            response = requests.get(
-                'http://httpbin.org/ip',
+            response = self._session_for_thread().get(
+                PROXY_TEST_URL,
                 proxies=proxy_dict,
                 timeout=self.test_timeout
             )
@@ -127,41 +521,73 @@ class ProxyManager:
             logger.debug(f"Proxy {proxy} failed: {e}")
             return False
 
-    def test_proxies_batch(self, proxies: List[str], max_workers: int = 10) -> List[Dict]:
-        """Test a batch of proxies and return working ones."""
-        working_proxies = []
-
-        def test_single_proxy(proxy):
-            if self.test_proxy(proxy):
-                working_proxies.append({
-                    'proxy': proxy,
-                    'last_used': None,
-                    'success_count': 0,
-                    'fail_count': 0
-                })
-
-        # Test proxies in parallel (limited concurrency)
-        threads = []
-        for i in range(0, len(proxies), max_workers):
-            batch = proxies[i:i + max_workers]
-            for proxy in batch:
-                thread = threading.Thread(
-                    target=test_single_proxy, args=(proxy,))
-                thread.start()
-                threads.append(thread)
-
-            # Wait for batch to complete
-            for thread in threads:
-                thread.join()
-            threads.clear()
+    async def _atest_proxy(self, session, semaphore, proxy: str) -> bool:
+        """Test a single proxy on the shared aiohttp session."""
+        async with semaphore:
+            try:
+                async with session.get(PROXY_TEST_URL, proxy=f'http://{proxy}') as response:
+                    if response.status == 200:
+                        logger.debug(f"Proxy {proxy} is working")
+                        return True
+                    logger.debug(
+                        f"Proxy {proxy} failed with status {response.status}")
+                    return False
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.debug(f"Proxy {proxy} failed: {e}")
+                return False
+
+    async def _atest_all(self, proxies: List[str], concurrency: int) -> List[bool]:
+        """Test proxies concurrently over one pooled ClientSession."""
+        semaphore = asyncio.Semaphore(concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.test_timeout)
+        connector = aiohttp.TCPConnector(limit=concurrency, ssl=False)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            return await asyncio.gather(
+                *(self._atest_proxy(session, semaphore, proxy) for proxy in proxies))
+
+    def test_proxies_batch(self, proxies: List[str], max_workers: int = 50) -> List[Dict]:
+        """Test a batch of proxies and return working ones.
+
+        Uses aiohttp when installed (up to async_concurrency checks in
+        flight), otherwise a thread pool of max_workers.
+        """
+        if aiohttp is not None:
+            results = asyncio.run(
+                self._atest_all(proxies, self.async_concurrency))
+        else:
+            # Each check just blocks on one socket, so a wide pool keeps every
+            # worker busy instead of waiting for the slowest proxy in a batch
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(self.test_proxy, proxies))
+
+        verified_at = time.time()
+        working_proxies = [
+            {
+                'proxy': proxy,
+                'last_used': None,
+                'success_count': 0,
+                'fail_count': 0,
+                'last_verified': verified_at
+            }
+            for proxy, ok in zip(proxies, results) if ok
+        ]
 
         logger.info(
             f"Found {len(working_proxies)} working proxies out of {len(proxies)} tested")
         return working_proxies
 
-    def refresh_proxies(self, force: bool = False) -> None:
-        """Refresh the proxy list."""
+    def refresh_proxies(self, force: bool = False, if_low: bool = False) -> None:
+        """Refresh the proxy list.
+
+        Args:
+            force: Refresh even if fetched recently or enough proxies remain
+            if_low: Skip the refresh if the pool was refilled while waiting
+                for the lock, so concurrent low-water callers coalesce
+        """
         with self.lock:
+            if if_low and len(self._by_addr) >= self.min_proxies:
+                return
+
             # Check if we need to refresh
             if not force and self.last_fetch and \
                datetime.now() - self.last_fetch < self.fetch_interval:
@@ -189,116 +615,239 @@ class ProxyManager:
             new_working = self.test_proxies_batch(test_proxies)
 
             # Merge with existing working proxies (avoid duplicates)
-            existing_proxies = {p['proxy'] for p in self.working_proxies}
-            for proxy_data in new_working:
-                if proxy_data['proxy'] not in existing_proxies:
-                    self.working_proxies.append(proxy_data)
+            added = [proxy_data['proxy'] for proxy_data in new_working
+                     if self._add_proxy(proxy_data)]
+            if added:
+                self._publish()
 
             self.last_fetch = datetime.now()
 
             # Save to persistent storage
-            self.save_working_proxies()
+            self._mark_dirty(*added)
 
             logger.info(
                 f"Proxy refresh complete. {len(self.working_proxies)} working proxies available")
 
     def get_proxy(self) -> Optional[str]:
         """Get a working proxy for use."""
-        with self.lock:
-            # Refresh if we have no proxies or too few
-            if len(self.working_proxies) < self.min_proxies:
-                self.refresh_proxies(force=True)
+        # Re-test stale entries loaded from disk once, in the background
+        if not self._revalidation_started:
+            self._start_revalidation()
 
-            if not self.working_proxies:
+        # Refresh if we have no proxies or too few (refresh_proxies takes
+        # the lock itself, so this must happen outside it)
+        if len(self._snapshot) < self.min_proxies:
+            self.refresh_proxies(force=True, if_low=True)
+
+        with self.lock:
+            if not self._by_addr:
                 logger.warning("No working proxies available after refresh")
                 return None
 
-            # Select proxy with least recent use
-            available_proxies = [
-                p for p in self.working_proxies
-                if p['last_used'] is None or
-                datetime.now() - p['last_used'] > timedelta(minutes=5)
-            ]
-
-            if not available_proxies:
-                # If all proxies were recently used, use the least recently used
-                available_proxies = sorted(
-                    self.working_proxies,
-                    key=lambda x: x['last_used'] or datetime.min
-                )
-
-            # Select random proxy from available ones
-            selected = random.choice(available_proxies)
-            selected['last_used'] = datetime.now()
-
-            logger.debug(f"Selected proxy: {selected['proxy']}")
-            return selected['proxy']
-
-    def mark_proxy_success(self, proxy: str) -> None:
-        """Mark a proxy as successful."""
-        with self.lock:
-            for p in self.working_proxies:
-                if p['proxy'] == proxy:
-                    p['success_count'] += 1
-                    # Save changes periodically (every 10 successes)
-                    if p['success_count'] % 10 == 0:
-                        self.save_working_proxies()
+            if self._weights_stale:
+                self._cum_entries = self._snapshot
+                self._cum_weights = list(itertools.accumulate(
+                    self._weight(p) for p in self._cum_entries))
+                self._weights_stale = False
+                self._marks_since_rebuild = 0
+
+            # Draw by track record in O(log n) from the cumulative weights,
+            # skipping proxies that haven't rested since their last use
+            now = time.monotonic()
+            total = self._cum_weights[-1]
+            selected = None
+            for _ in range(self.SAMPLE_ATTEMPTS):
+                i = bisect.bisect_right(self._cum_weights, random.random() * total)
+                p = self._cum_entries[min(i, len(self._cum_entries) - 1)]
+                if p['last_used'] is None or now - p['last_used'] > self.REST_PERIOD:
+                    selected = p
                     break
+            if selected is None:
+                # Draws kept hitting busy proxies: take the least recently used
+                selected = next(iter(self._by_addr.values()))
+
+            addr = selected['proxy']
+            self._by_addr.move_to_end(addr)
+            selected['last_used'] = now
+
+        self._mark_dirty(addr)
+        logger.debug(f"Selected proxy: {addr}")
+        return addr
+
+    def _start_revalidation(self) -> None:
+        """Start the one-off background re-test of stale proxies."""
+        with self._flusher_lock:
+            if self._revalidation_started:
+                return
+            self._revalidation_started = True
+        threading.Thread(target=self._revalidate_stale,
+                         name="proxy-revalidate", daemon=True).start()
+
+    def _revalidate_stale(self) -> None:
+        """Re-test proxies not verified within REVALIDATE_AFTER seconds.
+
+        Recently verified proxies are served immediately; stale ones stay
+        usable while being tested and are dropped only if the test fails.
+        """
+        now = time.time()
+        stale = [p for p in self._snapshot
+                 if now - p.get('last_verified', 0) > self.REVALIDATE_AFTER]
+        if not stale:
+            return
+
+        logger.info(f"Re-validating {len(stale)} stale proxies")
+        verified = {p['proxy']
+                    for p in self.test_proxies_batch([p['proxy'] for p in stale])}
+        verified_at = time.time()
+        with self.lock:
+            for p in stale:
+                if self._by_addr.get(p['proxy']) is not p:
+                    continue
+                if p['proxy'] in verified:
+                    p['last_verified'] = verified_at
+                else:
+                    self._remove_proxy(p)
+        self._mark_dirty(*verified)
+        logger.info(
+            f"Re-validation kept {len(verified)} of {len(stale)} stale proxies")
+
+    def _weight(self, proxy_data: Dict) -> float:
+        """Selection weight favouring proxies that succeed and respond fast."""
+        weight = (proxy_data['success_count'] + 1) / \
+            (proxy_data['fail_count'] + 1)
+        latency = proxy_data.get('last_latency')
+        if latency is not None and self._latency_avg and \
+           latency > 2 * self._latency_avg:
+            weight *= 0.5
+        return weight
+
+    def mark_proxy_success(self, proxy: str, latency: Optional[float] = None) -> None:
+        """Mark a proxy as successful.
+
+        The mark is queued and applied shortly after by the background
+        applier, so stats lag by at most one batch.
+
+        Args:
+            proxy: Proxy address
+            latency: Optional request duration in seconds through the proxy
+        """
+        self._marks.put((proxy, True, latency))
+        self._ensure_applier()
 
     def mark_proxy_failure(self, proxy: str) -> None:
-        """Mark a proxy as failed."""
+        """Mark a proxy as failed (queued, like mark_proxy_success)."""
+        self._marks.put((proxy, False, None))
+        self._ensure_applier()
+
+    def _ensure_applier(self) -> None:
+        """Start the background mark applier on first use."""
+        if self._applier is None:
+            with self._flusher_lock:
+                if self._applier is None:
+                    self._applier = threading.Thread(
+                        target=self._apply_loop, name="proxy-marks", daemon=True)
+                    self._applier.start()
+
+    def _apply_loop(self) -> None:
+        """Block for the next mark, then apply it with whatever else is queued."""
+        while True:
+            self._apply_marks([self._marks.get()])
+
+    def _apply_pending(self) -> None:
+        """Apply every queued mark now (used before a flush)."""
+        while True:
+            try:
+                first = self._marks.get_nowait()
+            except queue.Empty:
+                return
+            self._apply_marks([first])
+
+    def _apply_marks(self, batch: List[Tuple[str, bool, Optional[float]]]) -> None:
+        """Apply a batch of marks, topped up to MARK_BATCH, under one lock."""
+        while len(batch) < self.MARK_BATCH:
+            try:
+                batch.append(self._marks.get_nowait())
+            except queue.Empty:
+                break
+
+        updated = []
         with self.lock:
-            for i, p in enumerate(self.working_proxies):
-                if p['proxy'] == proxy:
+            removed = False
+            for proxy, ok, latency in batch:
+                p = self._by_addr.get(proxy)
+                if p is None:
+                    continue
+                if ok:
+                    p['success_count'] += 1
+                    self._total_success += 1
+                    if latency is not None:
+                        p['last_latency'] = latency
+                        if self._latency_avg is None:
+                            self._latency_avg = latency
+                        else:
+                            self._latency_avg += self.LATENCY_EWMA_ALPHA * \
+                                (latency - self._latency_avg)
+                else:
                     p['fail_count'] += 1
+                    self._total_fail += 1
                     # Remove proxy if it fails too often
                     if p['fail_count'] >= self.max_failures:
-                        removed_proxy = self.working_proxies.pop(i)
+                        self._remove_proxy(p, publish=False)
+                        removed = True
                         logger.info(
-                            f"Removed failing proxy: {proxy} (failures: {removed_proxy['fail_count']})")
-                        # Save changes to persistent storage
-                        self.save_working_proxies()
-
-                        # If we're running low on proxies, trigger a refresh
-                        if len(self.working_proxies) < self.min_proxies:
-                            logger.info(
-                                f"Running low on proxies ({len(self.working_proxies)}), will refresh on next request")
-                    break
+                            f"Removed failing proxy: {proxy} (failures: {p['fail_count']})")
+                        continue
+                updated.append(proxy)
+
+            if removed:
+                self._publish()
+                # If we're running low on proxies, trigger a refresh
+                if len(self._by_addr) < self.min_proxies:
+                    logger.info(
+                        f"Running low on proxies ({len(self._by_addr)}), will refresh on next request")
 
-    def get_proxy_stats(self) -> Dict:
-        """Get proxy statistics."""
-        with self.lock:
-            total_proxies = len(self.working_proxies)
-            if total_proxies == 0:
-                return {
-                    'total_proxies': 0,
-                    'avg_success_rate': 0,
-                    'last_refresh': self.last_fetch
-                }
-
-            total_success = sum(p['success_count']
-                                for p in self.working_proxies)
-            total_failures = sum(p['fail_count'] for p in self.working_proxies)
-            total_attempts = total_success + total_failures
-
-            avg_success_rate = (
-                total_success / total_attempts * 100) if total_attempts > 0 else 0
+            # Counts drift the weights only slowly, so rebuild after a
+            # run of marks rather than on every batch
+            self._marks_since_rebuild += len(updated)
+            if self._marks_since_rebuild >= self.WEIGHT_REBUILD_MARKS:
+                self._weights_stale = True
+
+        if updated:
+            self._mark_dirty(*updated)
 
+    def get_proxy_stats(self) -> Dict:
+        """Get proxy statistics (lock-free, from running totals)."""
+        total_proxies = len(self._snapshot)
+        if total_proxies == 0:
             return {
-                'total_proxies': total_proxies,
-                'total_success': total_success,
-                'total_failures': total_failures,
-                'avg_success_rate': round(avg_success_rate, 2),
+                'total_proxies': 0,
+                'avg_success_rate': 0,
                 'last_refresh': self.last_fetch
             }
 
-    def get_proxy_dict(self, proxy: str) -> Dict[str, str]:
-        """Convert proxy string to requests proxy dictionary."""
+        total_success = self._total_success
+        total_failures = self._total_fail
+        total_attempts = total_success + total_failures
+
+        avg_success_rate = (
+            total_success / total_attempts * 100) if total_attempts > 0 else 0
+
         return {
-            'http': f'http://{proxy}',
-            'https': f'http://{proxy}'
+            'total_proxies': total_proxies,
+            'total_success': total_success,
+            'total_failures': total_failures,
+            'avg_success_rate': round(avg_success_rate, 2),
+            'last_refresh': self.last_fetch
         }
 
+    def get_proxy_dict(self, proxy: str) -> Dict[str, str]:
+        """Convert proxy string to requests proxy dictionary.
+
+        The dict is cached per address and shared between callers, so it
+        must be treated as read-only.
+        """
+        return _proxy_dict(proxy)
+
 
 # Global proxy manager instance
 proxy_manager = ProxyManager()
@@ -314,9 +863,9 @@ def get_proxy_dict(proxy: str) -> Dict[str, str]:
     return proxy_manager.get_proxy_dict(proxy)
 
 
-def mark_proxy_success(proxy: str) -> None:
+def mark_proxy_success(proxy: str, latency: Optional[float] = None) -> None:
     """Mark proxy as successful."""
-    proxy_manager.mark_proxy_success(proxy)
+    proxy_manager.mark_proxy_success(proxy, latency)
 
 
 def mark_proxy_failure(proxy: str) -> None:
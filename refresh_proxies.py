@@ -3,7 +3,7 @@
 Proxy Refresh Script for GoogleRecaptchaBypass
 
 This script fetches fresh proxies from multiple sources, tests them,
-and updates the working_proxies.json file with verified working proxies.
+and updates the working_proxies.db database with verified working proxies.
 """
 
 import sys
@@ -64,7 +64,7 @@ def fetch_new_proxies(manager: ProxyManager, test_count: int = 50) -> List[Dict]
     print(f"🧪 Testing {len(test_proxies)} proxies...")
 
     start_time = time.time()
-    working_proxies = manager.test_proxies_batch(test_proxies, max_workers=20)
+    working_proxies = manager.test_proxies_batch(test_proxies)
     test_time = time.time() - start_time
 
     success_rate = (len(working_proxies) / len(test_proxies)) * \
@@ -82,16 +82,11 @@ def clean_old_proxies(manager: ProxyManager, max_failures: int = 3) -> int:
     """Remove proxies with too many failures."""
     print(f"🧹 Cleaning proxies with more than {max_failures} failures...")
 
-    initial_count = len(manager.working_proxies)
-    manager.working_proxies = [
-        p for p in manager.working_proxies
-        if p.get('fail_count', 0) <= max_failures
-    ]
-    removed_count = initial_count - len(manager.working_proxies)
+    removed_count = manager.remove_failed_proxies(max_failures)
 
     if removed_count > 0:
         print(f"🗑️  Removed {removed_count} failed proxies")
-        manager.save_working_proxies()
+        manager.flush()
     else:
         print("✅ No proxies needed cleaning")
 
@@ -99,25 +94,17 @@ def clean_old_proxies(manager: ProxyManager, max_failures: int = 3) -> int:
     return removed_count
 
 
-def merge_proxies(manager: ProxyManager, new_proxies: List[Dict], avoid_duplicates: bool = True) -> int:
+def merge_proxies(manager: ProxyManager, new_proxies: List[Dict]) -> int:
     """Merge new proxies with existing ones."""
     if not new_proxies:
         return 0
 
     print("🔀 Merging new proxies with existing ones...")
 
-    initial_count = len(manager.working_proxies)
-    existing_proxies = {p['proxy']
-                        for p in manager.working_proxies} if avoid_duplicates else set()
-
-    added_count = 0
-    for proxy_data in new_proxies:
-        if not avoid_duplicates or proxy_data['proxy'] not in existing_proxies:
-            manager.working_proxies.append(proxy_data)
-            added_count += 1
+    added_count = manager.add_working_proxies(new_proxies)
 
     print(f"➕ Added {added_count} new working proxies")
-    if avoid_duplicates and len(new_proxies) - added_count > 0:
+    if len(new_proxies) - added_count > 0:
         print(
             f"⚠️  Skipped {len(new_proxies) - added_count} duplicate proxies")
 
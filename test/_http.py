@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP client for the test modules
+
+All test modules get their Session from get_session() so they share one
+keep-alive connection pool to the service and the same retry policy. The captcha
+suites also share one ResultPoller, so polling for N outstanding captchas
+runs on a single background thread instead of N blocking loops, and
+submit via submit_and_wait() and report via format_captcha_summary().
+"""
+
+import atexit
+import functools
+import re
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import orjson  # Optional faster JSON parsing of responses
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import requests
+
+# Plain ASCII status tags, safe on any console encoding
+STATUS_OK = "[ OK ]"
+STATUS_FAIL = "[FAIL]"
+STATUS_WAIT = "[WAIT]"
+
+# Terminal /res.php replies: "OK|<token>" or "ERROR_<CODE>"
+_RES_RE = re.compile(r"\A(?:OK\|(?P<body>.*)|(?P<err>ERROR_\S+))\Z", re.DOTALL)
+
+_SESSION: Optional["requests.Session"] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def get_session() -> "requests.Session":
+    """Return the shared Session, importing requests on first use.
+
+    Importing a test module stays cheap; requests (and urllib3, idna,
+    ssl ...) only load once a test actually talks to the service.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                from urllib3.util.retry import Retry
+
+                session = requests.Session()
+                session.headers.update({"Connection": "keep-alive"})
+                session.mount("http://", HTTPAdapter(
+                    pool_connections=2,
+                    pool_maxsize=64,
+                    # Retries idempotent requests only; /in.php POSTs are never replayed
+                    max_retries=Retry(total=2, backoff_factor=0.1,
+                                      status_forcelist=[502, 503, 504], raise_on_status=False)
+                ))
+                atexit.register(session.close)
+                _SESSION = session
+    return _SESSION
+
+
+def parse_json(response: "requests.Response") -> Any:
+    """Parse a JSON response body, with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+class ResultPoller:
+    """Poll /res.php for every outstanding captcha from one thread.
+
+    Waiters register a captcha_id and block on a Future; the poller thread
+    sweeps the ids that are due and resolves each Future once its result is
+    terminal. Every id is polled as soon as it registers, then on its own
+    schedule, starting at 0.25s and backing off to every 3s for slow solves.
+    The deadline gates the sleep, not the GET: the last poll lands on the
+    deadline itself, so a result ready just before it is not missed. The
+    service has no batch ``ids=`` lookup, so a sweep is one GET per due id
+    over the shared keep-alive pool.
+    """
+
+    def __init__(self, base_url: str, api_key: str,
+                 session: Optional["requests.Session"] = None):
+        self._url = f"{base_url}/res.php"
+        self._api_key = api_key
+        self._session = session
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        # captcha_id -> [future, next_poll_at, delay, deadline]
+        self._pending: Dict[str, List] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def wait(self, captcha_id: str, max_wait: float) -> Tuple[bool, str]:
+        """Block until the captcha is solved, fails, or max_wait runs out.
+
+        Args:
+            captcha_id: ID returned by /in.php
+            max_wait: Seconds to wait for a terminal result
+
+        Returns:
+            (solved, token or error string), or (False, "TIMEOUT")
+        """
+        future: Future = Future()
+        now = time.monotonic()
+        with self._lock:
+            self._pending[captcha_id] = [future, now, 0.25, now + max_wait]
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="result-poller", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+        try:
+            # The poller resolves TIMEOUT itself after the final poll; the
+            # margin only covers that poll's own request timeout
+            return future.result(timeout=max_wait + 15)
+        except FutureTimeout:
+            return False, "TIMEOUT"
+        finally:
+            with self._lock:
+                self._pending.pop(captcha_id, None)
+
+    def _poll(self, captcha_id: str) -> Optional[Tuple[bool, str]]:
+        """Fetch one result; None while the captcha is still pending."""
+        try:
+            response = (self._session or get_session()).get(
+                self._url,
+                params={"key": self._api_key, "action": "get", "id": captcha_id},
+                timeout=10
+            )
+
+            if response.status_code == 200:
+                # Replies are short ASCII; skip requests' charset detection
+                match = _RES_RE.match(response.content.decode("ascii", "replace").strip())
+                if match is not None:
+                    body = match.group("body")
+                    if body is not None:
+                        return True, body
+                    return False, match.group("err")
+                # Continue waiting if CAPCHA_NOT_READY
+
+        except Exception:
+            pass
+
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                due = [cid for cid, entry in self._pending.items() if entry[1] <= now]
+                next_at = min((entry[1] for entry in self._pending.values()), default=None)
+
+            if not due:
+                # Sleep until the next id is due, or until a new one registers
+                self._wake.wait(None if next_at is None else next_at - now)
+                self._wake.clear()
+                continue
+
+            for captcha_id in due:
+                outcome = self._poll(captcha_id)
+                with self._lock:
+                    entry = self._pending.get(captcha_id)
+                    if entry is None:
+                        continue  # Waiter already timed out
+                    now = time.monotonic()
+                    if outcome is None and now < entry[3]:
+                        entry[2] = min(entry[2] * 1.6, 3.0)
+                        entry[1] = min(now + entry[2], entry[3])
+                    else:
+                        del self._pending[captcha_id]
+                        entry[0].set_result(outcome or (False, "TIMEOUT"))
+
+
+def safe_test(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Turn any exception raised by a test into the standard failure dict."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs) -> Dict[str, Any]:
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+    return wrapper
+
+
+@functools.lru_cache(maxsize=None)
+def result_poller(base_url: str, api_key: str) -> ResultPoller:
+    """Return the poller shared by every suite talking to base_url."""
+    return ResultPoller(base_url, api_key)
+
+
+@safe_test
+def submit_and_wait(base_url: str, api_key: str, payload: Dict[str, str],
+                    wait: float) -> Dict[str, Any]:
+    """Submit a captcha to /in.php and wait for its result.
+
+    Args:
+        base_url: Service root, e.g. http://localhost:5001
+        api_key: Key the shared result poller polls with
+        payload: Form fields for the submission
+        wait: Seconds to wait for a solution
+
+    Returns:
+        The standard test result dict
+    """
+    response = get_session().post(f"{base_url}/in.php", data=payload, timeout=15)
+
+    head, _, body = response.text.partition("|")
+    if response.status_code == 200 and head == "OK":
+        captcha_id = body.split("|", 1)[0]
+
+        # Outstanding captchas from every suite are polled by one shared thread
+        success, result = result_poller(base_url, api_key).wait(captcha_id, wait)
+
+        return {
+            "success": True,
+            "submission": "OK",
+            "captcha_id": captcha_id,
+            "solving_success": success,
+            "result": result[:50] + "..." if len(result) > 50 else result
+        }
+    else:
+        return {"success": False, "error": f"Submission failed: {response.text}"}
+
+
+def captcha_summary(tests: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Submission and solving counts for a captcha suite's results."""
+    submission_success = sum(1 for r in tests.values() if r.get("success"))
+    solving_success = sum(1 for r in tests.values() if r.get("solving_success"))
+    total = len(tests)
+    return {
+        "total": total,
+        "submission_success": submission_success,
+        "solving_success": solving_success,
+        "submission_rate": submission_success/total*100,
+        "solving_rate": solving_success/total*100 if total > 0 else 0
+    }
+
+
+def format_captcha_summary(title: str, tests: Dict[str, Dict[str, Any]]) -> str:
+    """Render a captcha suite's report, one line per test, as one string."""
+    summary = captcha_summary(tests)
+    total = summary["total"]
+    lines = [
+        f"{title}:",
+        f"   Submissions: {summary['submission_success']}/{total} successful",
+        f"   Solving: {summary['solving_success']}/{total} successful",
+    ]
+
+    for test_name, result in tests.items():
+        if result.get("success"):
+            status = STATUS_OK if result.get("solving_success") else STATUS_WAIT
+            lines.append(f"{status} {test_name}: Submitted OK")
+            if result.get("solving_success"):
+                lines.append(f"   `- Solved: {result.get('result', 'N/A')}")
+            elif result.get("result") == "TIMEOUT":
+                lines.append("   `- Timeout (expected for testing)")
+            else:
+                lines.append(f"   `- Status: {result.get('result', 'N/A')}")
+        else:
+            lines.append(f"{STATUS_FAIL} {test_name}: {result.get('error', 'Unknown error')}")
+    return "\n".join(lines) + "\n"
@@ -8,9 +8,14 @@ This script runs all test suites and provides a comprehensive report.
 import sys
 import os
 import time
+import argparse
+import json
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List, Optional, Tuple
 
 # Add current directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -18,6 +23,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import test modules
 try:
+    import _http
+    from _http import get_session, parse_json
     from test_service_health import run_health_tests
     from test_recaptcha_v2 import run_recaptcha_v2_tests
     from test_recaptcha_v3 import run_recaptcha_v3_tests
@@ -29,40 +36,177 @@ except ImportError as e:
 
 API_BASE_URL = "http://localhost:5001"
 
+_HCAPTCHA_POST = {
+    "key": "fake_680d0e29b28040ef",
+    "method": "hcaptcha",
+    "sitekey": "10000000-ffff-ffff-ffff-000000000001",
+    "pageurl": "https://example.com/hcaptcha",
+    "soft_id": "135"
+}
 
-def print_banner():
-    """Print test runner banner."""
-    print("=" * 80)
-    print("🧪 COMPREHENSIVE TEST SUITE - Google reCAPTCHA Bypass Service")
-    print("=" * 80)
-    print(f"🎯 Target Service: {API_BASE_URL}")
-    print(f"⏰ Start Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print("=" * 80)
-    print()
+
+class _SuiteOutput:
+    """stdout stand-in that buffers writes per suite thread.
+
+    Suites run concurrently, so each one's prints are collected in its
+    own buffer and replayed in order afterwards instead of interleaving.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def start(self) -> None:
+        self._local.buffer = io.StringIO()
+
+    def finish(self) -> str:
+        buffer = self._local.buffer
+        self._local.buffer = None
+        return buffer.getvalue()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+# Summary keys (passed, total) per category; other categories report a
+# single "success" flag
+CATEGORY_RULES = {
+    "health": ("passed", "total"),
+    "api_formats": ("passed", "total"),
+    "recaptcha_v2": ("submission_success", "total"),
+    "recaptcha_v3": ("submission_success", "total"),
+}
 
 
-def check_service_availability() -> bool:
+def _category_counts(category: str, result: Dict[str, Any]) -> Tuple[int, int]:
+    """(passed, total) test counts for one category's result."""
+    keys = CATEGORY_RULES.get(category)
+    if keys is None:
+        return (1 if result.get("success") else 0), 1
+    summary = result["summary"]
+    return summary[keys[0]], summary[keys[1]]
+
+
+# Results of suites that passed recently, so quick reruns can skip them
+TEST_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".test_cache.json")
+TEST_CACHE_TTL = 60
+# Service code the suites exercise; editing any of it invalidates the cache
+_REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVICE_MODULES = tuple(os.path.join(_REPO_DIR, name) for name in (
+    "fake_2captcha_app.py", "RecaptchaSolver.py", "proxy_manager.py",
+    "chrome_manager.py"))
+
+
+def _suite_passed(category: str, result: Dict[str, Any]) -> bool:
+    """Whether every test in a suite result passed (only these are cached)."""
+    passed, total = _category_counts(category, result)
+    return total > 0 and passed == total
+
+
+def load_test_cache() -> Dict[str, Any]:
+    """Load cached suite results from the previous runs."""
+    try:
+        with open(TEST_CACHE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_test_cache(cache: Dict[str, Any]) -> None:
+    """Persist cached suite results for the next run."""
+    try:
+        with open(TEST_CACHE_FILE, "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"⚠️  Could not write test cache: {e}")
+
+
+def cached_suite(name: str, fn: Callable[[], Dict[str, Any]], cache: Dict[str, Any],
+                 ttl: float = TEST_CACHE_TTL) -> Callable[[], Dict[str, Any]]:
+    """Wrap a suite so a recent passing result is reused instead of rerun.
+
+    Entries are keyed by suite name and remember the mtimes of the module
+    defining the suite, the shared _http helpers and the service modules
+    under test; editing any of them invalidates them. Only the wrapper
+    touches cache, and each suite has its own key, so wrapped suites can
+    run concurrently.
+    """
+    source_mtime = [os.path.getmtime(path) for path in (
+        fn.__code__.co_filename, _http.__file__, *SERVICE_MODULES)]
+
+    def run() -> Dict[str, Any]:
+        entry = cache.get(name)
+        if entry and entry.get("mtime") == source_mtime:
+            age = time.time() - entry["timestamp"]
+            if age < ttl:
+                print(f"♻️  Reusing passing result from {age:.0f}s ago (--no-cache to rerun)")
+                return entry["result"]
+
+        started = time.time()
+        result = fn()
+        if _suite_passed(name, result):
+            cache[name] = {
+                "mtime": source_mtime,
+                "timestamp": time.time(),
+                "duration": time.time() - started,
+                "result": result,
+            }
+        else:
+            cache.pop(name, None)
+        return result
+
+    return run
+
+
+def print_banner():
+    """Print test runner banner."""
+    rule = "=" * 80
+    sys.stdout.write(
+        f"{rule}\n"
+        "🧪 COMPREHENSIVE TEST SUITE - Google reCAPTCHA Bypass Service\n"
+        f"{rule}\n"
+        f"🎯 Target Service: {API_BASE_URL}\n"
+        f"⏰ Start Time: {datetime.now():%Y-%m-%d %H:%M:%S}\n"
+        f"{rule}\n\n"
+    )
+
+
+def check_service_availability(session: Optional[requests.Session] = None, timeout: float = 2) -> bool:
     """Check if the service is running."""
     try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=5)
+        response = (session or get_session()).get(f"{API_BASE_URL}/health", timeout=timeout)
         return response.status_code == 200
-    except:
+    except requests.exceptions.RequestException:
         return False
 
 
 def wait_for_service(max_wait: int = 30) -> bool:
-    """Wait for service to become available."""
+    """Wait for service to become available.
+
+    Polls with exponential backoff (0.1s, 0.2s, 0.4s ... capped at 2s)
+    until the service answers or max_wait seconds have passed.
+    """
     print("⏳ Waiting for service to become available...")
 
-    for i in range(max_wait):
+    start = time.monotonic()
+    i = 0
+    while True:
         if check_service_availability():
-            print("✅ Service is available!")
+            print(f"✅ Service is available after {time.monotonic() - start:.1f}s!")
             return True
 
-        print(f"   Attempt {i+1}/{max_wait}...")
-        time.sleep(1)
-
-    return False
+        elapsed = time.monotonic() - start
+        if elapsed >= max_wait:
+            return False
+        print(f"   Still waiting ({elapsed:.1f}s/{max_wait}s)...")
+        time.sleep(min(2.0, 0.1 * (2 ** i)))
+        i += 1
 
 
 def run_hcaptcha_test() -> Dict[str, Any]:
@@ -70,15 +214,9 @@ def run_hcaptcha_test() -> Dict[str, Any]:
     print("🛡️  Running hCaptcha Test...")
 
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/in.php",
-            data={
-                "key": "fake_680d0e29b28040ef",
-                "method": "hcaptcha",
-                "sitekey": "10000000-ffff-ffff-ffff-000000000001",
-                "pageurl": "https://example.com/hcaptcha",
-                "soft_id": "135"
-            },
+            data=_HCAPTCHA_POST,
             timeout=15
         )
 
@@ -101,10 +239,10 @@ def run_proxy_test() -> Dict[str, Any]:
     print("🌐 Running Proxy Integration Test...")
 
     try:
-        response = requests.get(f"{API_BASE_URL}/proxies", timeout=10)
+        response = get_session().get(f"{API_BASE_URL}/proxies", timeout=10)
 
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             proxy_stats = data.get("proxy_stats", {})
             return {
                 "success": True,
@@ -123,36 +261,14 @@ def compile_final_report(test_results: Dict[str, Any]) -> Dict[str, Any]:
     """Compile final test report."""
 
     # Calculate overall statistics
-    total_tests = 0
-    passed_tests = 0
-    failed_tests = 0
-    categories_passed = 0
+    counts = [_category_counts(category, result)
+              for category, result in test_results.items()]
+    passed_tests = sum(passed for passed, _ in counts)
+    total_tests = sum(total for _, total in counts)
+    failed_tests = total_tests - passed_tests
+    categories_passed = sum(1 for passed, _ in counts if passed > 0)
     total_categories = len(test_results)
 
-    for category, result in test_results.items():
-        if category in ["health", "api_formats"]:
-            if result.get("summary", {}).get("passed", 0) > 0:
-                categories_passed += 1
-                passed_tests += result["summary"]["passed"]
-            failed_tests += result["summary"]["total"] - \
-                result["summary"]["passed"]
-            total_tests += result["summary"]["total"]
-        elif category in ["recaptcha_v2", "recaptcha_v3"]:
-            if result.get("summary", {}).get("submission_success", 0) > 0:
-                categories_passed += 1
-                passed_tests += result["summary"]["submission_success"]
-            failed_tests += result["summary"]["total"] - \
-                result["summary"]["submission_success"]
-            total_tests += result["summary"]["total"]
-        else:
-            # Simple success/fail tests
-            if result.get("success"):
-                categories_passed += 1
-                passed_tests += 1
-            else:
-                failed_tests += 1
-            total_tests += 1
-
     success_rate = (passed_tests / total_tests * 100) if total_tests > 0 else 0
     category_success_rate = (
         categories_passed / total_categories * 100) if total_categories > 0 else 0
@@ -170,96 +286,105 @@ def compile_final_report(test_results: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def print_final_report(test_results: Dict[str, Any], summary: Dict[str, Any], duration: float):
-    """Print comprehensive final report."""
-
-    print("\n" + "=" * 80)
-    print("📊 COMPREHENSIVE TEST RESULTS SUMMARY")
-    print("=" * 80)
-
-    print(f"⏱️  Total Duration: {duration:.2f} seconds")
-    print(f"📋 Total Tests: {summary['total_tests']}")
-    print(f"✅ Passed: {summary['passed_tests']}")
-    print(f"❌ Failed: {summary['failed_tests']}")
-    print(f"📈 Success Rate: {summary['success_rate']:.1f}%")
-    print(
+    """Print comprehensive final report (one write to stdout)."""
+    lines = []
+
+    lines.append("\n" + "=" * 80)
+    lines.append("📊 COMPREHENSIVE TEST RESULTS SUMMARY")
+    lines.append("=" * 80)
+
+    lines.append(f"⏱️  Total Duration: {duration:.2f} seconds")
+    lines.append(f"📋 Total Tests: {summary['total_tests']}")
+    lines.append(f"✅ Passed: {summary['passed_tests']}")
+    lines.append(f"❌ Failed: {summary['failed_tests']}")
+    lines.append(f"📈 Success Rate: {summary['success_rate']:.1f}%")
+    lines.append(
         f"📂 Categories: {summary['categories_passed']}/{summary['total_categories']} passed")
-    print(f"🏆 Overall Status: {summary['overall_status']}")
+    lines.append(f"🏆 Overall Status: {summary['overall_status']}")
 
-    print("\n📋 Category Breakdown:")
+    lines.append("\n📋 Category Breakdown:")
 
     # Health Tests
     health = test_results.get("health", {})
     health_status = "✅ PASS" if health.get(
         "summary", {}).get("passed", 0) > 0 else "❌ FAIL"
-    print(f"   🏥 Service Health: {health_status}")
+    lines.append(f"   🏥 Service Health: {health_status}")
     if health.get("summary"):
-        print(
+        lines.append(
             f"      Tests: {health['summary']['passed']}/{health['summary']['total']}")
 
     # reCAPTCHA v2 Tests
     v2 = test_results.get("recaptcha_v2", {})
     v2_status = "✅ PASS" if v2.get("summary", {}).get(
         "submission_success", 0) > 0 else "❌ FAIL"
-    print(f"   🤖 reCAPTCHA v2: {v2_status}")
+    lines.append(f"   🤖 reCAPTCHA v2: {v2_status}")
     if v2.get("summary"):
-        print(
+        lines.append(
             f"      Submissions: {v2['summary']['submission_success']}/{v2['summary']['total']}")
-        print(
+        lines.append(
             f"      Solving: {v2['summary']['solving_success']}/{v2['summary']['total']}")
 
     # reCAPTCHA v3 Tests
     v3 = test_results.get("recaptcha_v3", {})
     v3_status = "✅ PASS" if v3.get("summary", {}).get(
         "submission_success", 0) > 0 else "❌ FAIL"
-    print(f"   🎯 reCAPTCHA v3: {v3_status}")
+    lines.append(f"   🎯 reCAPTCHA v3: {v3_status}")
     if v3.get("summary"):
-        print(
+        lines.append(
             f"      Submissions: {v3['summary']['submission_success']}/{v3['summary']['total']}")
-        print(
+        lines.append(
             f"      Solving: {v3['summary']['solving_success']}/{v3['summary']['total']}")
 
     # API Format Tests
     api = test_results.get("api_formats", {})
     api_status = "✅ PASS" if api.get("summary", {}).get(
         "passed", 0) > 0 else "❌ FAIL"
-    print(f"   🔄 API Formats: {api_status}")
+    lines.append(f"   🔄 API Formats: {api_status}")
     if api.get("summary"):
-        print(
+        lines.append(
             f"      Tests: {api['summary']['passed']}/{api['summary']['total']}")
 
     # hCaptcha Test
     hcaptcha = test_results.get("hcaptcha", {})
     hcaptcha_status = "✅ PASS" if hcaptcha.get("success") else "❌ FAIL"
-    print(f"   🛡️  hCaptcha: {hcaptcha_status}")
+    lines.append(f"   🛡️  hCaptcha: {hcaptcha_status}")
 
     # Proxy Test
     proxy = test_results.get("proxy", {})
     proxy_status = "✅ PASS" if proxy.get("success") else "❌ FAIL"
-    print(f"   🌐 Proxy Integration: {proxy_status}")
+    lines.append(f"   🌐 Proxy Integration: {proxy_status}")
     if proxy.get("total_proxies"):
-        print(f"      Proxies Available: {proxy['total_proxies']}")
+        lines.append(f"      Proxies Available: {proxy['total_proxies']}")
 
-    print("\n💡 Notes:")
-    print("   • Submission tests verify API compatibility")
-    print("   • Solving tests may timeout during testing (expected)")
-    print("   • Focus on submission success for API functionality")
-    print("   • Full solving tests require real captcha pages")
+    lines.append("\n💡 Notes:")
+    lines.append("   • Submission tests verify API compatibility")
+    lines.append("   • Solving tests may timeout during testing (expected)")
+    lines.append("   • Focus on submission success for API functionality")
+    lines.append("   • Full solving tests require real captcha pages")
 
-    print("\n🚀 Service Status:")
+    lines.append("\n🚀 Service Status:")
     if summary["overall_status"] == "PASS":
-        print("   ✅ Service is ready for production use!")
-        print("   ✅ All core functionality working")
-        print("   ✅ GSA integration ready")
+        lines.append("   ✅ Service is ready for production use!")
+        lines.append("   ✅ All core functionality working")
+        lines.append("   ✅ GSA integration ready")
     else:
-        print("   ⚠️  Some issues detected")
-        print("   🔧 Check service configuration")
-        print("   🔧 Verify Chrome connectivity")
+        lines.append("   ⚠️  Some issues detected")
+        lines.append("   🔧 Check service configuration")
+        lines.append("   🔧 Verify Chrome connectivity")
 
-    print("=" * 80)
+    lines.append("=" * 80)
+
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 def main():
     """Main test runner function."""
+    parser = argparse.ArgumentParser(
+        description="Run all test suites against the service")
+    parser.add_argument('--no-cache', '--full', dest='no_cache', action='store_true',
+                        help=f'Run every suite, even ones that passed in the last {TEST_CACHE_TTL}s')
+    args = parser.parse_args()
+
     start_time = time.time()
     print_banner()
 
@@ -276,31 +401,51 @@ def main():
 
     print("✅ Service is available, starting comprehensive tests...\n")
 
-    # Run all test suites
-    test_results = {}
-
-    print("🏥 Running Service Health Tests...")
-    test_results["health"] = run_health_tests()
-    print()
-
-    print("🤖 Running reCAPTCHA v2 Tests...")
-    test_results["recaptcha_v2"] = run_recaptcha_v2_tests()
-    print()
-
-    print("🎯 Running reCAPTCHA v3 Tests...")
-    test_results["recaptcha_v3"] = run_recaptcha_v3_tests()
-    print()
-
-    print("🔄 Running API Format Tests...")
-    test_results["api_formats"] = run_api_format_tests()
-    print()
-
-    # Run additional tests
-    test_results["hcaptcha"] = run_hcaptcha_test()
-    print()
+    # Run all test suites concurrently; they only wait on HTTP and don't
+    # depend on each other. Output is buffered per suite and printed in
+    # the usual order once everything has finished.
+    suites = [
+        ("health", "🏥 Running Service Health Tests...", run_health_tests),
+        ("recaptcha_v2", "🤖 Running reCAPTCHA v2 Tests...", run_recaptcha_v2_tests),
+        ("recaptcha_v3", "🎯 Running reCAPTCHA v3 Tests...", run_recaptcha_v3_tests),
+        ("api_formats", "🔄 Running API Format Tests...", run_api_format_tests),
+        ("hcaptcha", None, run_hcaptcha_test),
+        ("proxy", None, run_proxy_test),
+    ]
+
+    cache = {} if args.no_cache else load_test_cache()
+    suites = [(name, banner, cached_suite(name, fn, cache))
+              for name, banner, fn in suites]
+
+    output = _SuiteOutput(sys.stdout)
+
+    def run_captured(banner, fn):
+        output.start()
+        try:
+            if banner:
+                print(banner)
+            result = fn()
+            print()
+            return result, output.finish()
+        except BaseException:
+            output.finish()
+            raise
+
+    print("🚀 Running all test suites concurrently...\n")
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=len(suites)) as ex:
+            futures = {name: ex.submit(run_captured, banner, fn)
+                       for name, banner, fn in suites}
+            outcomes = {name: f.result() for name, f in futures.items()}
+    finally:
+        sys.stdout = output.stream
 
-    test_results["proxy"] = run_proxy_test()
-    print()
+    test_results = {}
+    for name, (result, captured) in outcomes.items():
+        sys.stdout.write(captured)
+        test_results[name] = result
+    save_test_cache(cache)
 
     # Generate final report
     duration = time.time() - start_time
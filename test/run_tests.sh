@@ -150,26 +150,31 @@ fi
 echo "✅ Service is running, starting tests..."
 echo
 
+# The suites have no asserts or __doc__ lookups, so run them optimized and
+# byte-compile up front; the imported modules then load straight from .pyc
+PYTHON="python -O"
+$PYTHON -m compileall -q . >/dev/null
+
 # Run tests based on options
 if [ "$RUN_ALL" = true ]; then
     echo "Running comprehensive test suite..."
-    python run_comprehensive_tests.py
+    $PYTHON run_comprehensive_tests.py
     TEST_EXIT_CODE=$?
 elif [ "$RUN_HEALTH" = true ] && [ "$RUN_V2" = false ] && [ "$RUN_V3" = false ] && [ "$RUN_API" = false ]; then
     echo "Running health tests only..."
-    python test_service_health.py
+    $PYTHON test_service_health.py
     TEST_EXIT_CODE=$?
 elif [ "$RUN_V2" = true ] && [ "$RUN_HEALTH" = false ] && [ "$RUN_V3" = false ] && [ "$RUN_API" = false ]; then
     echo "Running reCAPTCHA v2 tests only..."
-    python test_recaptcha_v2.py
+    $PYTHON test_recaptcha_v2.py
     TEST_EXIT_CODE=$?
 elif [ "$RUN_V3" = true ] && [ "$RUN_HEALTH" = false ] && [ "$RUN_V2" = false ] && [ "$RUN_API" = false ]; then
     echo "Running reCAPTCHA v3 tests only..."
-    python test_recaptcha_v3.py
+    $PYTHON test_recaptcha_v3.py
     TEST_EXIT_CODE=$?
 elif [ "$RUN_API" = true ] && [ "$RUN_HEALTH" = false ] && [ "$RUN_V2" = false ] && [ "$RUN_V3" = false ]; then
     echo "Running API format tests only..."
-    python test_api_formats.py
+    $PYTHON test_api_formats.py
     TEST_EXIT_CODE=$?
 else
     echo "Running selected test modules..."
@@ -177,28 +182,28 @@ else
     
     if [ "$RUN_HEALTH" = true ]; then
         echo "🏥 Running health tests..."
-        python test_service_health.py
+        $PYTHON test_service_health.py
         if [ $? -ne 0 ]; then TEST_EXIT_CODE=1; fi
         echo
     fi
     
     if [ "$RUN_V2" = true ]; then
         echo "🤖 Running reCAPTCHA v2 tests..."
-        python test_recaptcha_v2.py
+        $PYTHON test_recaptcha_v2.py
         if [ $? -ne 0 ]; then TEST_EXIT_CODE=1; fi
         echo
     fi
     
     if [ "$RUN_V3" = true ]; then
         echo "🎯 Running reCAPTCHA v3 tests..."
-        python test_recaptcha_v3.py
+        $PYTHON test_recaptcha_v3.py
         if [ $? -ne 0 ]; then TEST_EXIT_CODE=1; fi
         echo
     fi
     
     if [ "$RUN_API" = true ]; then
         echo "🔄 Running API format tests..."
-        python test_api_formats.py
+        $PYTHON test_api_formats.py
         if [ $? -ne 0 ]; then TEST_EXIT_CODE=1; fi
         echo
     fi
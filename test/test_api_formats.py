@@ -7,30 +7,86 @@ Tests both the classic 2captcha API format and the modern JSON API format.
 
 import sys
 import os
-import requests
+import threading
 import time
-from typing import Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Any, Callable, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from _http import get_session, parse_json  # noqa: E402  (shared keep-alive pool)
+
 API_BASE_URL = "http://localhost:5001"
 API_KEY = "fake_680d0e29b28040ef"
 TIMEOUT = 20
 
+# Static request bodies shared by the probes (treated as read-only)
+_RECAPTCHA_V2_POST = {
+    "key": API_KEY,
+    "method": "userrecaptcha",
+    "googlekey": "6Le-wvkSAAAAAPBMRTvw0Q4Muexq9bi0DJwx_mJ-",
+    "pageurl": "https://www.google.com/recaptcha/api2/demo",
+    "soft_id": "135"
+}
+_MODERN_JSON = {
+    "googlekey": "6Le-wvkSAAAAAPBMRTvw0Q4Muexq9bi0DJwx_mJ-",
+    "pageurl": "https://www.google.com/recaptcha/api2/demo"
+}
+_MODERN_HEADERS = {"X-API-Key": API_KEY}
+
+# 2captcha plain-text responses classified by their first three characters
+_PREFIXES = {
+    "OK|": "ready",
+    "OK_": "recorded",   # OK_REPORT_RECORDED
+    "CAP": "not_ready",  # CAPCHA_NOT_READY
+    "ERR": "error",
+}
+_NOT_READY_LEN = len("CAPCHA_NOT_READY")
+
+
+def _classify_2captcha(text: str) -> str:
+    """Classify a 2captcha response body with one prefix lookup.
+
+    Returns "ready", "recorded", "not_ready" or "error"; anything
+    unrecognised counts as an error.
+    """
+    text = text.strip()
+    status = _PREFIXES.get(text[:3], "error")
+    if status == "not_ready" and len(text) != _NOT_READY_LEN:
+        return "error"
+    return status
+
+
+# Short-lived GET cache for stable endpoints (balance), keyed by (url, params)
+_CACHE: Dict[Tuple, Tuple[float, "requests.Response"]] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def cached_get(url: str, params: Optional[Dict[str, str]] = None, ttl: float = 3.0,
+               timeout: float = 10) -> "requests.Response":
+    """GET through the shared session, reusing a response fetched within the last ttl seconds."""
+    key = (url, tuple(sorted((params or {}).items())))
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        hit = _CACHE.get(key)
+    if hit is not None and now - hit[0] < ttl:
+        return hit[1]
+    response = get_session().get(url, params=params, timeout=timeout)
+    with _CACHE_LOCK:
+        _CACHE[key] = (now, response)
+    return response
+
 
 def test_2captcha_format_submission() -> Dict[str, Any]:
     """Test classic 2captcha format submission."""
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/in.php",
-            data={
-                "key": API_KEY,
-                "method": "userrecaptcha",
-                "googlekey": "6Le-wvkSAAAAAPBMRTvw0Q4Muexq9bi0DJwx_mJ-",
-                "pageurl": "https://www.google.com/recaptcha/api2/demo",
-                "soft_id": "135"
-            },
+            data=_RECAPTCHA_V2_POST,
             timeout=15
         )
 
@@ -52,7 +108,7 @@ def test_2captcha_format_submission() -> Dict[str, Any]:
 def test_2captcha_format_result_check(captcha_id: str) -> Dict[str, Any]:
     """Test classic 2captcha format result checking."""
     try:
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/res.php",
             params={"key": API_KEY, "action": "get", "id": captcha_id},
             timeout=10
@@ -63,7 +119,7 @@ def test_2captcha_format_result_check(captcha_id: str) -> Dict[str, Any]:
             return {
                 "success": True,
                 "format": "2captcha",
-                "status": "ready" if result.startswith("OK|") else "not_ready" if "CAPCHA_NOT_READY" in result else "error",
+                "status": _classify_2captcha(result),
                 "response": result
             }
         else:
@@ -76,18 +132,15 @@ def test_2captcha_format_result_check(captcha_id: str) -> Dict[str, Any]:
 def test_modern_api_submission() -> Dict[str, Any]:
     """Test modern JSON API submission."""
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/captcha",
-            json={
-                "googlekey": "6Le-wvkSAAAAAPBMRTvw0Q4Muexq9bi0DJwx_mJ-",
-                "pageurl": "https://www.google.com/recaptcha/api2/demo"
-            },
-            headers={"X-API-Key": API_KEY},
+            json=_MODERN_JSON,
+            headers=_MODERN_HEADERS,
             timeout=15
         )
 
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             captcha_id = data.get("captcha")
             if captcha_id:
                 return {
@@ -108,11 +161,11 @@ def test_modern_api_submission() -> Dict[str, Any]:
 def test_modern_api_result_check(captcha_id: str) -> Dict[str, Any]:
     """Test modern JSON API result checking."""
     try:
-        response = requests.get(
+        response = get_session().get(
             f"{API_BASE_URL}/captcha/{captcha_id}", timeout=10)
 
         if response.status_code in [200, 202]:
-            data = response.json()
+            data = parse_json(response)
             return {
                 "success": True,
                 "format": "modern",
@@ -134,10 +187,9 @@ def test_balance_endpoints() -> Dict[str, Any]:
 
     # Test 2captcha format balance
     try:
-        response = requests.get(
+        response = cached_get(
             f"{API_BASE_URL}/res.php",
-            params={"key": API_KEY, "action": "getbalance"},
-            timeout=10
+            params={"key": API_KEY, "action": "getbalance"}
         )
 
         if response.status_code == 200:
@@ -154,11 +206,11 @@ def test_balance_endpoints() -> Dict[str, Any]:
 
     # Test modern format balance (user endpoint)
     try:
-        response = requests.get(
-            f"{API_BASE_URL}/user?key={API_KEY}", timeout=10)
+        response = cached_get(
+            f"{API_BASE_URL}/user", params={"key": API_KEY})
 
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response)
             results["modern_balance"] = {
                 "success": True,
                 "balance": data.get("balance"),
@@ -180,22 +232,23 @@ def test_error_handling() -> Dict[str, Any]:
 
     # Test 2captcha format error handling
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/in.php",
             data={"key": "invalid_key", "method": "userrecaptcha"},
             timeout=10
         )
 
+        text = response.text.strip()
         results["2captcha_error"] = {
-            "success": "ERROR_KEY_DOES_NOT_EXIST" in response.text,
-            "response": response.text.strip()
+            "success": _classify_2captcha(text) == "error" and text == "ERROR_KEY_DOES_NOT_EXIST",
+            "response": text
         }
     except Exception as e:
         results["2captcha_error"] = {"success": False, "error": str(e)}
 
     # Test modern format error handling
     try:
-        response = requests.post(
+        response = get_session().post(
             f"{API_BASE_URL}/captcha",
             json={"googlekey": "test"},
             headers={"X-API-Key": "invalid_key"},
@@ -205,7 +258,7 @@ def test_error_handling() -> Dict[str, Any]:
         results["modern_error"] = {
             "success": response.status_code == 401,
             "status_code": response.status_code,
-            "response": response.json() if response.headers.get('content-type', '').startswith('application/json') else response.text
+            "response": parse_json(response) if response.headers.get('content-type', '').startswith('application/json') else response.text
         }
     except Exception as e:
         results["modern_error"] = {"success": False, "error": str(e)}
@@ -213,82 +266,90 @@ def test_error_handling() -> Dict[str, Any]:
     return results
 
 
-def test_report_functionality() -> Dict[str, Any]:
-    """Test reporting functionality in 2captcha format."""
-    # First submit a captcha to get an ID
-    submission = test_2captcha_format_submission()
-    if not submission.get("success"):
-        return {"success": False, "error": "Could not submit captcha for testing"}
+def test_report_functionality(captcha_id: str) -> Dict[str, Any]:
+    """Test reporting functionality in 2captcha format.
 
-    captcha_id = submission["captcha_id"]
-    results = {}
+    Args:
+        captcha_id: ID of an already submitted captcha to report on
+    """
+    def report(action: str) -> Dict[str, Any]:
+        try:
+            response = get_session().get(
+                f"{API_BASE_URL}/res.php",
+                params={"key": API_KEY, "action": action, "id": captcha_id},
+                timeout=10
+            )
 
-    # Test reportbad
-    try:
-        response = requests.get(
-            f"{API_BASE_URL}/res.php",
-            params={"key": API_KEY, "action": "reportbad", "id": captcha_id},
-            timeout=10
-        )
+            return {
+                "success": _classify_2captcha(response.text) == "recorded",
+                "response": response.text.strip()
+            }
+        except Exception as e:
+            return {"success": False, "error": str(e)}
 
-        results["reportbad"] = {
-            "success": "OK_REPORT_RECORDED" in response.text,
-            "response": response.text.strip()
-        }
-    except Exception as e:
-        results["reportbad"] = {"success": False, "error": str(e)}
+    # reportbad and reportgood are independent; overlap their round-trips
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        f_bad = ex.submit(report, "reportbad")
+        f_good = ex.submit(report, "reportgood")
+        return {"reportbad": f_bad.result(), "reportgood": f_good.result()}
 
-    # Test reportgood
-    try:
-        response = requests.get(
-            f"{API_BASE_URL}/res.php",
-            params={"key": API_KEY, "action": "reportgood", "id": captcha_id},
-            timeout=10
-        )
 
-        results["reportgood"] = {
-            "success": "OK_REPORT_RECORDED" in response.text,
-            "response": response.text.strip()
-        }
-    except Exception as e:
-        results["reportgood"] = {"success": False, "error": str(e)}
+def _wait_result(check_fn: Callable[[str], Dict[str, Any]], captcha_id: str,
+                 max_s: float = 2.0, step: float = 0.1) -> Dict[str, Any]:
+    """Poll a result check until it stops reporting not_ready.
 
-    return results
+    Returns the first result that is ready, an error, or a failed
+    request, or the last not_ready result once max_s has passed.
+    """
+    deadline = time.monotonic() + max_s
+    while True:
+        result = check_fn(captcha_id)
+        if result.get("status") != "not_ready" or time.monotonic() >= deadline:
+            return result
+        time.sleep(step)
 
 
 def run_api_format_tests() -> Dict[str, Any]:
     """Run all API format tests."""
     print("🔄 Running API Format Tests...")
-
-    # Test submissions
-    print("   Testing submissions...")
-    captcha_2captcha = test_2captcha_format_submission()
-    captcha_modern = test_modern_api_submission()
-
-    # Test result checking
-    print("   Testing result checking...")
-    result_2captcha = None
-    result_modern = None
-
-    if captcha_2captcha.get("success"):
-        time.sleep(2)  # Brief wait
-        result_2captcha = test_2captcha_format_result_check(
-            captcha_2captcha["captcha_id"])
-
-    if captcha_modern.get("success"):
-        time.sleep(2)  # Brief wait
-        result_modern = test_modern_api_result_check(
-            captcha_modern["captcha_id"])
-
-    # Test other functionality
-    print("   Testing balance endpoints...")
-    balance_tests = test_balance_endpoints()
-
-    print("   Testing error handling...")
-    error_tests = test_error_handling()
-
-    print("   Testing report functionality...")
-    report_tests = test_report_functionality()
+    print("   Testing submissions, result checking, balance endpoints,")
+    print("   error handling and report functionality concurrently...")
+
+    # The probes are independent, so their round-trips overlap on the
+    # shared session; each result check runs after its own submission
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        f_2captcha = ex.submit(test_2captcha_format_submission)
+        f_modern = ex.submit(test_modern_api_submission)
+        f_balance = ex.submit(test_balance_endpoints)
+        f_error = ex.submit(test_error_handling)
+
+        def check_after(submission_future, check_fn):
+            submission = submission_future.result()
+            if not submission.get("success"):
+                return None
+            return _wait_result(check_fn, submission["captcha_id"])
+
+        f_result_2captcha = ex.submit(
+            check_after, f_2captcha, test_2captcha_format_result_check)
+        f_result_modern = ex.submit(
+            check_after, f_modern, test_modern_api_result_check)
+
+        def report_after(submission_future):
+            # Reuse the 2captcha submission instead of submitting again
+            submission = submission_future.result()
+            if not submission.get("success"):
+                return {"skipped": True}
+            return test_report_functionality(submission["captcha_id"])
+
+        f_report = ex.submit(report_after, f_2captcha)
+
+        captcha_2captcha = f_2captcha.result()
+        captcha_modern = f_modern.result()
+        result_2captcha = f_result_2captcha.result()
+        result_modern = f_result_modern.result()
+        balance_tests = f_balance.result()
+        error_tests = f_error.result()
+        report_tests = f_report.result()
 
     # Compile results
     results = {
@@ -305,30 +366,11 @@ def run_api_format_tests() -> Dict[str, Any]:
         "report_tests": report_tests
     }
 
-    # Summary
-    tests_passed = 0
-    tests_total = 0
-
-    # Count successful submissions
-    if captcha_2captcha.get("success"):
-        tests_passed += 1
-    tests_total += 1
-
-    if captcha_modern.get("success"):
-        tests_passed += 1
-    tests_total += 1
-
-    # Count successful balance tests
-    for test in balance_tests.values():
-        if test.get("success"):
-            tests_passed += 1
-        tests_total += 1
-
-    # Count successful error tests
-    for test in error_tests.values():
-        if test.get("success"):
-            tests_passed += 1
-        tests_total += 1
+    # Summary: submissions, balance and error probes each count once
+    probes = [captcha_2captcha, captcha_modern,
+              *balance_tests.values(), *error_tests.values()]
+    tests_total = len(probes)
+    tests_passed = sum(1 for p in probes if p.get("success"))
 
     print(f"📊 API Format Tests: {tests_passed}/{tests_total} passed")
 
@@ -4,313 +4,473 @@ Test script for Fake 2captcha API service
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
+import argparse
 import os
-from typing import Dict, Any
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from dotenv import load_dotenv
 
+try:
+    import orjson  # Optional faster JSON parsing of responses
+except ImportError:
+    orjson = None
+
 # Load environment variables
 load_dotenv()
 
 # Configuration
-API_BASE_URL = f"http://localhost:{os.getenv('PORT', '5000')}"
+# Environment, read once at import
+CONFIGURED_API_KEY = os.getenv('FAKE_2CAPTCHA_API_KEY')
+API_KEY = CONFIGURED_API_KEY if CONFIGURED_API_KEY is not None else 'test_key'
+PORT = os.getenv('PORT', '5000')
+API_BASE_URL = f"http://localhost:{PORT}"
+
+# Endpoint URLs, built once
+HEALTH_URL = f"{API_BASE_URL}/health"
+USER_URL = f"{API_BASE_URL}/user?key={API_KEY}"
+STATUS_URL = f"{API_BASE_URL}/status"
+CONFIG_URL = f"{API_BASE_URL}/config"
+IN_PHP_URL = f"{API_BASE_URL}/in.php"
+IN_PHP_BATCH_URL = f"{API_BASE_URL}/in.php/batch"
+RES_URL_TMPL = f"{API_BASE_URL}/res.php?key={API_KEY}&action=get&id={{id}}"
+CAPTCHA_URL = f"{API_BASE_URL}/captcha"
+
 TEST_TIMEOUT = 30  # seconds
+RESULT_DEADLINE = 15.0  # seconds to poll a captcha result before giving up
+BATCH_SIZE = 25  # captchas per batch submission test
+
+# Submission bodies shared by the tests (treated as read-only)
+SUBMIT_FORM = {
+    'key': API_KEY,
+    'method': 'userrecaptcha',
+    'googlekey': '6LcA-wAAAAAAABlX02ZqFPKNP_y66oTYvY74Y5B',
+    'pageurl': 'https://www.google.com/recaptcha/api2/demo'
+}
+MODERN_SUBMIT = {
+    'googlekey': '6LcA-wAAAAAAABlX02ZqFPKNP_y66oTYvY74Y5B',
+    'pageurl': 'https://www.google.com/recaptcha/api2/demo'
+}
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialise a JSON body, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode()
+
+
+# JSON bodies serialised once and sent as raw bytes
+JSON_HEADERS = {'Content-Type': 'application/json'}
+MODERN_BODY = _dumps(MODERN_SUBMIT)
+MODERN_HEADERS = {'X-API-Key': API_KEY, **JSON_HEADERS}
+BATCH_BODY = _dumps([SUBMIT_FORM] * BATCH_SIZE)
+
+# One keep-alive session for every test, so the checks reuse a socket.
+# Every request goes to the one local service, so a single pool suffices;
+# it is sized above the concurrent workers so none waits for a connection.
+# Only failed connects are retried; a POST that reached the server is not.
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(
+    pool_connections=32, pool_maxsize=32,
+    max_retries=Retry(total=2, connect=2, read=0, status=0)))
+
+
+# Output lines, kept per thread so concurrent test groups never interleave;
+# main() writes them all to stdout in one go at the end
+_LOG = threading.local()
+
+
+def log(message: str = "") -> None:
+    """Record one line of output for the current thread."""
+    lines = getattr(_LOG, "lines", None)
+    if lines is None:
+        lines = _LOG.lines = []
+    lines.append(message)
+
+
+def take_log() -> List[str]:
+    """Return and clear the current thread's recorded lines."""
+    lines = getattr(_LOG, "lines", None) or []
+    _LOG.lines = []
+    return lines
+
+
+def _json(response: requests.Response) -> Any:
+    """Parse a JSON response body, with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def poll_until_ready(url: str, deadline: Optional[float] = None) -> requests.Response:
+    """Poll a result URL until the captcha leaves the not-ready state.
+
+    Backs off from 0.1s up to 1s between polls, so fast solves are seen
+    almost immediately and slow ones don't hammer the service.
+
+    Args:
+        url: Result endpoint for one captcha
+        deadline: Seconds to keep polling (default RESULT_DEADLINE)
+
+    Returns:
+        The first terminal response, or the last one seen at the deadline
+    """
+    if deadline is None:
+        deadline = RESULT_DEADLINE
+    end = time.monotonic() + deadline
+    delay = 0.1
+    while True:
+        response = SESSION.get(url, timeout=10)
+        pending = (response.status_code == 202
+                   or b'CAPCHA_NOT_READY' in response.content)
+        if not pending or time.monotonic() >= end:
+            return response
+        time.sleep(min(delay, max(0.0, end - time.monotonic())))
+        delay = min(delay * 2, 1.0)
+
+
+# Failures a test reports itself: transport errors and undecodable bodies.
+# Anything else is a bug and surfaces as a crash in run_plan.
+_TEST_ERRORS = (requests.RequestException, ValueError)
+
+
+def run_check(name: str, url: str, expect: int = 200, method: str = 'GET',
+              timeout: float = 10, **kwargs) -> Optional[Any]:
+    """Request one endpoint and report the outcome.
+
+    Args:
+        name: Label used in the pass/fail line
+        url: Endpoint URL
+        expect: Status code that counts as a pass
+        method: HTTP method
+        timeout: Request timeout in seconds
+        **kwargs: Passed through to SESSION.request
+
+    Returns:
+        The decoded JSON body on a pass, otherwise None
+    """
+    try:
+        response = SESSION.request(method, url, timeout=timeout, **kwargs)
+        if response.status_code == expect:
+            data = _json(response)
+            log(f"✅ {name} passed: {data}")
+            return data
+        log(f"❌ {name} failed: {response.status_code}")
+    except _TEST_ERRORS as e:
+        log(f"❌ {name} error: {e}")
+    return None
 
 
 def test_health_check() -> bool:
     """Test the health check endpoint."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/health", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Health check passed: {data}")
-            return True
-        else:
-            print(f"❌ Health check failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Health check error: {e}")
-        return False
+    return run_check("Health check", HEALTH_URL) is not None
 
 
 def test_balance_check() -> bool:
     """Test the balance check endpoint."""
-    try:
-        api_key = os.getenv('FAKE_2CAPTCHA_API_KEY', 'test_key')
-        response = requests.get(
-            f"{API_BASE_URL}/user?key={api_key}", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Balance check passed: {data}")
-            return True
-        else:
-            print(f"❌ Balance check failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Balance check error: {e}")
-        return False
+    return run_check("Balance check", USER_URL) is not None
 
 
 def test_status_check() -> bool:
     """Test the status check endpoint."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/status", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Status check passed: {data}")
-            return True
-        else:
-            print(f"❌ Status check failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Status check error: {e}")
-        return False
+    return run_check("Status check", STATUS_URL) is not None
 
 
 def test_config_check() -> bool:
     """Test the configuration check endpoint."""
-    try:
-        response = requests.get(f"{API_BASE_URL}/config", timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Config check passed: {data}")
-            return True
-        else:
-            print(f"❌ Config check failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print(f"❌ Config check error: {e}")
-        return False
+    return run_check("Config check", CONFIG_URL) is not None
 
 
-def test_captcha_submit() -> bool:
-    """Test captcha submission."""
-    try:
-        api_key = os.getenv('FAKE_2CAPTCHA_API_KEY', 'test_key')
+def test_captcha_submit() -> Optional[str]:
+    """Test captcha submission; returns the captcha ID for the result test."""
+    data = run_check("Captcha submit test", IN_PHP_URL, method='POST',
+                     data=SUBMIT_FORM, timeout=TEST_TIMEOUT)
+    return data.get('request') if data else None
 
-        # Test data
-        test_data = {
-            'key': api_key,
-            'method': 'userrecaptcha',
-            'googlekey': '6LcA-wAAAAAAABlX02ZqFPKNP_y66oTYvY74Y5B',
-            'pageurl': 'https://www.google.com/recaptcha/api2/demo'
-        }
 
-        response = requests.post(
-            f"{API_BASE_URL}/in.php", data=test_data, timeout=TEST_TIMEOUT)
+def test_batch_submit(n: int = BATCH_SIZE) -> bool:
+    """Test submitting n captchas in one /in.php/batch request.
 
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Captcha submit test passed: {data}")
-            return data.get('request')  # Return captcha ID for result test
+    Falls back to n concurrent /in.php POSTs when the service has no
+    batch endpoint, so older builds still get the throughput check.
+    """
+    try:
+        start = time.perf_counter()
+        body = BATCH_BODY if n == BATCH_SIZE else _dumps([SUBMIT_FORM] * n)
+        response = SESSION.post(IN_PHP_BATCH_URL, data=body,
+                                headers=JSON_HEADERS, timeout=TEST_TIMEOUT)
+        if response.status_code == 404:
+            with ThreadPoolExecutor(max_workers=min(n, 16)) as ex:
+                replies = list(ex.map(
+                    lambda _: SESSION.post(IN_PHP_URL, data=SUBMIT_FORM,
+                                           timeout=TEST_TIMEOUT).text, range(n)))
+            mode = "individual"
+        elif response.status_code == 200:
+            replies = _json(response)
+            mode = "batch"
         else:
-            print(f"❌ Captcha submit test failed: {response.status_code}")
-            return None
+            log(f"❌ Batch submit test failed: {response.status_code}")
+            return False
+        elapsed = time.perf_counter() - start
 
-    except Exception as e:
-        print(f"❌ Captcha submit test error: {e}")
-        return None
+        accepted = sum(1 for r in replies if r.startswith('OK|'))
+        if accepted == n:
+            log(f"✅ Batch submit test passed: {n} captchas ({mode}) "
+                  f"in {elapsed * 1000:.0f}ms")
+            return True
+        log(f"❌ Batch submit test failed: {accepted}/{n} accepted ({mode})")
+        return False
+
+    except _TEST_ERRORS as e:
+        log(f"❌ Batch submit test error: {e}")
+        return False
 
 
 def test_captcha_result(captcha_id: str) -> bool:
     """Test getting captcha result."""
     if not captcha_id:
-        print("⚠️ Skipping captcha result test - no captcha ID")
+        log("⚠️ Skipping captcha result test - no captcha ID")
         return True
 
     try:
-        api_key = os.getenv('FAKE_2CAPTCHA_API_KEY', 'test_key')
-
-        # Wait a bit for the captcha to start solving
-        print(
-            f"⏳ Waiting 3 seconds for captcha {captcha_id} to start solving...")
-        time.sleep(3)
-
-        # Try to get result (it might not be ready yet)
-        response = requests.get(
-            f"{API_BASE_URL}/res.php?key={api_key}&action=get&id={captcha_id}",
-            timeout=10
-        )
+        # Poll until solved (it might still not be ready at the deadline)
+        log(f"⏳ Polling captcha {captcha_id} until it is ready...")
+        response = poll_until_ready(RES_URL_TMPL.format(id=captcha_id))
 
         if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Captcha result test passed: {data}")
+            data = _json(response)
+            log(f"✅ Captcha result test passed: {data}")
             return True
         elif response.status_code == 400:
-            data = response.json()
-            if 'CAPCHA_NOT_READY' in str(data):
-                print(f"⚠️ Captcha result test - not ready yet: {data}")
+            data = _json(response)
+            # 2captcha JSON replies carry the status code in "request"
+            status = data.get('request') if isinstance(data, dict) else data
+            if status == 'CAPCHA_NOT_READY':
+                log(f"⚠️ Captcha result test - not ready yet: {data}")
                 return True  # This is expected
             else:
-                print(f"❌ Captcha result test failed: {data}")
+                log(f"❌ Captcha result test failed: {data}")
                 return False
         elif response.status_code == 404:
-            print(
+            log(
                 f"❌ Captcha result test failed: Captcha ID {captcha_id} not found (404)")
             return False
         else:
-            print(f"❌ Captcha result test failed: {response.status_code}")
+            log(f"❌ Captcha result test failed: {response.status_code}")
             return False
 
-    except Exception as e:
-        print(f"❌ Captcha result test error: {e}")
+    except _TEST_ERRORS as e:
+        log(f"❌ Captcha result test error: {e}")
         return False
 
 
-def test_modern_api() -> bool:
-    """Test the modern API endpoints."""
-    try:
-        api_key = os.getenv('FAKE_2CAPTCHA_API_KEY', 'test_key')
-
-        # Test modern submit
-        test_data = {
-            'googlekey': '6LcA-wAAAAAAABlX02ZqFPKNP_y66oTYvY74Y5B',
-            'pageurl': 'https://www.google.com/recaptcha/api2/demo'
-        }
-
-        headers = {'X-API-Key': api_key}
-
-        response = requests.post(
-            f"{API_BASE_URL}/captcha",
-            json=test_data,
-            headers=headers,
-            timeout=TEST_TIMEOUT
-        )
-
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Modern API submit test passed: {data}")
-            return data.get('captcha')  # Return captcha ID
-        else:
-            print(f"❌ Modern API submit test failed: {response.status_code}")
-            return None
-
-    except Exception as e:
-        print(f"❌ Modern API submit test error: {e}")
-        return None
+def test_modern_api() -> Optional[str]:
+    """Test the modern API submit; returns the captcha ID."""
+    data = run_check("Modern API submit test", CAPTCHA_URL, method='POST',
+                     data=MODERN_BODY, headers=MODERN_HEADERS,
+                     timeout=TEST_TIMEOUT)
+    return data.get('captcha') if data else None
 
 
 def test_modern_result(captcha_id: str) -> bool:
     """Test getting result via modern API."""
     if not captcha_id:
-        print("⚠️ Skipping modern result test - no captcha ID")
+        log("⚠️ Skipping modern result test - no captcha ID")
         return True
 
     try:
-        # Wait a bit for the captcha to start solving
-        print(
-            f"⏳ Waiting 3 seconds for captcha {captcha_id} to start solving...")
-        time.sleep(3)
-
-        response = requests.get(
-            f"{API_BASE_URL}/captcha/{captcha_id}", timeout=10)
+        # Poll until solved (it might still not be ready at the deadline)
+        log(f"⏳ Polling captcha {captcha_id} until it is ready...")
+        response = poll_until_ready(f"{CAPTCHA_URL}/{captcha_id}")
 
         if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Modern result test passed: {data}")
+            data = _json(response)
+            log(f"✅ Modern result test passed: {data}")
             return True
         elif response.status_code == 202:
-            data = response.json()
-            print(f"⚠️ Modern result test - not ready yet: {data}")
+            data = _json(response)
+            log(f"⚠️ Modern result test - not ready yet: {data}")
             return True  # This is expected
         elif response.status_code == 404:
-            print(
+            log(
                 f"❌ Modern result test failed: Captcha ID {captcha_id} not found (404)")
             return False
         else:
-            print(f"❌ Modern result test failed: {response.status_code}")
+            log(f"❌ Modern result test failed: {response.status_code}")
             return False
 
-    except Exception as e:
-        print(f"❌ Modern result test error: {e}")
+    except _TEST_ERRORS as e:
+        log(f"❌ Modern result test error: {e}")
         return False
 
 
 def check_environment() -> bool:
     """Check if environment variables are properly configured."""
-    print("\n🔍 Environment Check:")
+    log("\n🔍 Environment Check:")
 
-    api_key = os.getenv('FAKE_2CAPTCHA_API_KEY')
-    port = os.getenv('PORT', '5000')
-
-    if api_key and api_key != 'your_fake_api_key_here':
-        print(f"✅ FAKE_2CAPTCHA_API_KEY is configured")
+    if CONFIGURED_API_KEY and CONFIGURED_API_KEY != 'your_fake_api_key_here':
+        log(f"✅ FAKE_2CAPTCHA_API_KEY is configured")
     else:
-        print(f"⚠️ FAKE_2CAPTCHA_API_KEY not configured")
+        log(f"⚠️ FAKE_2CAPTCHA_API_KEY not configured")
 
-    print(f"✅ PORT configured: {port}")
+    log(f"✅ PORT configured: {PORT}")
 
     return True
 
 
+# Tests left out by --fast: the throughput check submits BATCH_SIZE captchas
+SLOW_TESTS = {"Batch Submit"}
+
+# Every test as (name, function, dependency). A test with a dependency
+# runs after it and receives its result (the captcha ID); it is skipped
+# when the dependency fails.
+PLAN = [
+    ("Health Check", test_health_check, None),
+    ("Balance Check", test_balance_check, None),
+    ("Status Check", test_status_check, None),
+    ("Config Check", test_config_check, None),
+    ("Batch Submit", test_batch_submit, None),
+    ("Captcha Submit (2captcha format)", test_captcha_submit, None),
+    ("Captcha Result (2captcha format)", test_captcha_result,
+     "Captcha Submit (2captcha format)"),
+    ("Modern API Submit", test_modern_api, None),
+    ("Modern API Result", test_modern_result, "Modern API Submit"),
+]
+
+
+def run_plan(plan: List[Tuple[str, Callable[..., Any], Optional[str]]]) -> Tuple[int, int]:
+    """Run every test in the plan concurrently; returns (passed, total).
+
+    Each test's output is captured on its worker thread and replayed in
+    plan order. Skipped tests count toward neither passed nor total.
+    """
+    def run_step(name, func, dep_future):
+        take_log()
+        args = ()
+        if dep_future is not None:
+            dep_result = dep_future.result()[0]
+            if not dep_result:
+                return None, False, take_log()
+            args = (dep_result,)
+
+        log(f"\n📋 Testing: {name}")
+        try:
+            result = func(*args)
+        except Exception as e:
+            log(f"❌ {name} crashed: {e}")
+            result = None
+        return result, True, take_log()
+
+    # One worker per test, so a test blocked on its dependency never
+    # starves the dependency itself
+    futures: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=len(plan)) as ex:
+        for name, func, dep in plan:
+            futures[name] = ex.submit(run_step, name, func,
+                                      futures[dep] if dep else None)
+        outcomes = [futures[name].result() for name, _, _ in plan]
+
+    passed = total = 0
+    for result, ran, lines in outcomes:
+        for line in lines:
+            log(line)
+        total += ran
+        passed += ran and bool(result)
+
+    return passed, total
+
+
+def bench(name: str, url: str, n: int) -> None:
+    """Hit one endpoint n times and log mean/p50/p95/p99 latency."""
+    timings = []
+    errors = 0
+    for _ in range(n):
+        start = time.perf_counter_ns()
+        try:
+            SESSION.get(url, timeout=10)
+        except requests.RequestException:
+            errors += 1
+            continue
+        timings.append(time.perf_counter_ns() - start)
+
+    if not timings:
+        log(f"❌ {name}: all {n} requests failed")
+        return
+
+    timings.sort()
+    count = len(timings)
+
+    def pct(p: float) -> float:
+        return timings[min(count - 1, int(count * p))] / 1e6
+
+    mean = sum(timings) / count / 1e6
+    log(f"   {name:<8} mean={mean:.2f}ms p50={pct(0.50):.2f}ms "
+        f"p95={pct(0.95):.2f}ms p99={pct(0.99):.2f}ms"
+        + (f" ({errors} failed)" if errors else ""))
+
+
+def run_latency(n: int) -> None:
+    """Measure per-endpoint latency over n sequential requests each."""
+    log(f"⏱️ Endpoint latency ({n} requests each):")
+    for name, url in [("health", HEALTH_URL), ("user", USER_URL),
+                      ("status", STATUS_URL), ("config", CONFIG_URL)]:
+        bench(name, url, n)
+    sys.stdout.write("\n".join(take_log()) + "\n")
+
+
 def main():
     """Run all tests."""
-    print("🧪 Fake 2captcha API Integration Test Suite")
-    print("=" * 55)
+    parser = argparse.ArgumentParser(description="Fake 2captcha API test suite")
+    parser.add_argument("--latency", type=int, metavar="N",
+                        help="measure per-endpoint latency over N requests instead of testing")
+    parser.add_argument("--fast", action="store_true",
+                        help="CI mode: check each result once instead of polling, "
+                             "and skip the batch throughput test")
+    args = parser.parse_args()
+    if args.latency:
+        run_latency(args.latency)
+        return
+
+    plan = PLAN
+    if args.fast:
+        # A not-ready result already passes, so one poll proves the endpoint
+        global RESULT_DEADLINE
+        RESULT_DEADLINE = 0.0
+        plan = [step for step in PLAN if step[0] not in SLOW_TESTS]
+
+    log("🧪 Fake 2captcha API Integration Test Suite")
+    log("=" * 55)
 
     # Check environment
     check_environment()
 
-    print("\n🚀 Running API Tests:")
-    print("-" * 30)
+    log("\n🚀 Running API Tests:")
+    log("-" * 30)
 
-    tests = [
-        ("Health Check", test_health_check),
-        ("Balance Check", test_balance_check),
-        ("Status Check", test_status_check),
-        ("Config Check", test_config_check),
-    ]
+    passed, total = run_plan(plan)
 
-    passed = 0
-    total = len(tests)
-
-    for test_name, test_func in tests:
-        print(f"\n📋 Testing: {test_name}")
-        try:
-            if test_func():
-                passed += 1
-        except Exception as e:
-            print(f"❌ {test_name} crashed: {e}")
-
-    # Test captcha solving (these might take longer)
-    print(f"\n📋 Testing: Captcha Submit (2captcha format)")
-    captcha_id = test_captcha_submit()
-    if captcha_id:
-        passed += 1
-        total += 1
-
-        print(f"\n📋 Testing: Captcha Result (2captcha format)")
-        if test_captcha_result(captcha_id):
-            passed += 1
-        total += 1
-
-    # Test modern API
-    print(f"\n📋 Testing: Modern API Submit")
-    modern_captcha_id = test_modern_api()
-    if modern_captcha_id:
-        passed += 1
-        total += 1
-
-        print(f"\n📋 Testing: Modern API Result")
-        if test_modern_result(modern_captcha_id):
-            passed += 1
-        total += 1
-
-    print("\n" + "=" * 55)
-    print(f"📊 Test Results: {passed}/{total} tests passed")
+    log("\n" + "=" * 55)
+    log(f"📊 Test Results: {passed}/{total} tests passed")
 
     if passed == total:
-        print("🎉 All tests passed! The Fake 2captcha API is working correctly.")
+        log("🎉 All tests passed! The Fake 2captcha API is working correctly.")
     else:
-        print("⚠️ Some tests failed. Check the configuration and try again.")
-
-    print("\n💡 GSA Configuration:")
-    api_key = os.getenv('FAKE_2CAPTCHA_API_KEY', 'your_api_key_here')
-    port = os.getenv('PORT', '5000')
-    print(f"   Service Type: 2captcha API")
-    print(f"   API URL: http://localhost:{port}")
-    print(f"   API Key: {api_key}")
+        log("⚠️ Some tests failed. Check the configuration and try again.")
+
+    log("\n💡 GSA Configuration:")
+    api_key = (CONFIGURED_API_KEY if CONFIGURED_API_KEY is not None
+               else 'your_api_key_here')
+    log(f"   Service Type: 2captcha API")
+    log(f"   API URL: {API_BASE_URL}")
+    log(f"   API Key: {api_key}")
+
+    sys.stdout.write("\n".join(take_log()) + "\n")
 
 
 if __name__ == "__main__":